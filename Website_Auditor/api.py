@@ -0,0 +1,122 @@
+# api.py - Lightweight JSON HTTP endpoint for headless audits (never imports Gradio)
+
+import json
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from auditor import audit_url
+from batch import normalize_url
+from jobs import get_queue, get_worker
+from metrics import send_metrics
+
+def truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+class AuditHandler(BaseHTTPRequestHandler):
+    """
+    GET  /audit?url=example.com&scores_only=1&measure=0
+    POST /audit  {"url": "example.com", "scores_only": true, "measure": false}
+    POST /jobs   {"urls": ["example.com", ...], "scores_only": true}  → queued batch
+    GET  /jobs/<id>, GET /jobs?batch=<batch>
+    GET  /metrics, GET /healthz
+    """
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def run_audit(self, params):
+        url = normalize_url(str(params.get('url') or ''))
+        if not url:
+            self.send_json(400, {'error': "Missing 'url'"})
+            return
+        try:
+            result = audit_url(
+                url,
+                scores_only=truthy(params.get('scores_only', False)),
+                measure=truthy(params.get('measure', True)),
+                mode='api'
+            )
+        except Exception as e:
+            self.send_json(502, {'url': url, 'error': str(e)})
+            return
+        self.send_json(200, {'url': url, **result})
+
+    def submit_jobs(self, params):
+        urls = params.get('urls') or [params.get('url') or '']
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            self.send_json(400, {'error': "'urls' must be a list of strings"})
+            return
+        urls = [url for url in map(normalize_url, urls) if url]
+        if not urls:
+            self.send_json(400, {'error': "Missing 'urls'"})
+            return
+        batch, ids = get_queue().submit(
+            urls,
+            scores_only=truthy(params.get('scores_only', False)),
+            measure=truthy(params.get('measure', True))
+        )
+        self.send_json(202, {'batch': batch, 'jobs': ids})
+
+    def show_jobs(self, parsed):
+        job_id = parsed.path[len('/jobs/'):]
+        if job_id:
+            job = get_queue().get(int(job_id)) if job_id.isdigit() else None
+            self.send_json(200 if job else 404, job or {'error': 'Unknown job'})
+            return
+        batch = parse_qs(parsed.query).get('batch', [''])[-1]
+        if not batch:
+            self.send_json(400, {'error': "Missing 'batch'"})
+            return
+        queue = get_queue()
+        self.send_json(200, {'batch': batch, 'counts': queue.counts(batch), 'jobs': queue.batch_jobs(batch)})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/audit':
+            self.run_audit({k: v[-1] for k, v in parse_qs(parsed.query).items()})
+        elif parsed.path == '/jobs' or parsed.path.startswith('/jobs/'):
+            self.show_jobs(parsed)
+        elif parsed.path == '/healthz':
+            self.send_json(200, {'ok': True})
+        elif parsed.path == '/metrics':
+            send_metrics(self)
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path not in ('/audit', '/jobs'):
+            self.send_json(404, {'error': 'Not found'})
+            return
+        try:
+            params = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': 'Body must be JSON'})
+            return
+        params = params if isinstance(params, dict) else {}
+        if path == '/jobs':
+            self.submit_jobs(params)
+        else:
+            self.run_audit(params)
+
+    def log_message(self, format, *args):
+        print(f"[API] {self.address_string()} {format % args}")
+
+def serve(host='127.0.0.1', port=8080):
+    server = ThreadingHTTPServer((host, port), AuditHandler)
+    server.daemon_threads = True
+    get_worker()
+    print(f"JSON API listening on http://{host}:{port}/audit (queued jobs at /jobs)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    serve()
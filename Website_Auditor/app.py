@@ -1,107 +1,134 @@
-import gradio as gr 
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
+import json
 import os
-import re
-from dotenv import load_dotenv
-
-# Load API key
-load_dotenv()
-
-# Website Scraper Function
-def scrape_website(url):
-    try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        return {
-            'title': soup.title.string.strip() if soup.title else 'No title',
-            'description': soup.find('meta', {'name': 'description'}).get('content').strip() if soup.find('meta', {'name': 'description'}) else 'No description',
-            'h1_count': len(soup.find_all('h1')),
-            'img_without_alt': len([img for img in soup.find_all('img') if not img.get('alt')])
-        }
-    except Exception as e:
-        print(f"[Scrape Error] {e}")
-        return None
-
-# GPT-4o Analysis Function
-def analyze_with_ai(data):
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-    prompt = f"""
-Act as a professional SEO auditor. Analyze this website data and produce a structured report.
-
-Title: {data['title']}
-Description: {data['description'][:500]}...
-H1 tags: {data['h1_count']}
-Images missing alt: {data['img_without_alt']}
-
-Format:
-
-OVERALL SCORE: [score]/100
-
-CATEGORY SCORES:
-• SEO: [score]/100
-• Accessibility: [score]/100
-• Performance: [score]/100
-
-KEY FINDINGS:
-• [finding 1]
-• [finding 2]
-• [finding 3]
-
-TOP RECOMMENDATIONS:
-🔴 HIGH PRIORITY: ...
-🟡 MEDIUM PRIORITY: ...
-🔵 LOW PRIORITY: ...
-"""
-
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response.choices[0].message.content
-
-# Format output as HTML
-def format_analysis(analysis):
-    if not analysis:
-        return "No analysis available."
-
-    formatted = analysis.replace('\n\n', '<br><br>').replace('\n', '<br>')
-    formatted = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', formatted)
-
-    # Styled section headers
-    formatted = re.sub(r'OVERALL SCORE:', '<h2 style="color: #4CAF50;">🎯 OVERALL SCORE:</h2>', formatted)
-    formatted = re.sub(r'CATEGORY SCORES:', '<h3 style="color: #2196F3;">📊 CATEGORY SCORES:</h3>', formatted)
-    formatted = re.sub(r'KEY FINDINGS:', '<h3 style="color: #FF9800;">🔍 KEY FINDINGS:</h3>', formatted)
-    formatted = re.sub(r'TOP RECOMMENDATIONS:', '<h3 style="color: #9C27B0;">💡 TOP RECOMMENDATIONS:</h3>', formatted)
-
-    return f'''
-<div style="font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; background: #121212; color: #F5F5F5; border-radius: 10px;">
-    {formatted}
-</div>
-'''
+import tempfile
+import time
+from html import escape
+from auditor import scrape_website, measure_assets, stream_analysis
+from scoring import score_page, format_scores
+from render import IncrementalRenderer, format_analysis, format_site_report, format_timings
+from metrics import metrics, timed, record_stage, serve_metrics
+from crawler import crawl
+from batch import load_urls
+from jobs import get_queue, get_worker, FINISHED
+
+POLL_INTERVAL = 1.0
 
 # Full Workflow
-def audit_website(url):
+def audit_website(url, scores_only=False, show_timings=False, measure=True):
     if not url.strip():
         return "Please enter a website URL."
     if not url.startswith('http'):
         url = 'https://' + url
 
+    timings = {}
     yield "🔄 Scraping website content..."
-    data = scrape_website(url)
+    data = scrape_website(url, timings, parser=get_worker().parse)
     if not data:
+        metrics.inc('audits_total', mode='single', result='error')
         yield "❌ Failed to scrape website. Please check the URL."
         return
 
+    if measure:
+        yield "📦 Measuring scripts, stylesheets and images..."
+        data = measure_assets(url, data, timings)
+
+    with timed('score', timings):
+        scores = score_page(data)
+    if scores_only:
+        with timed('render', timings):
+            report = format_analysis(format_scores(scores))
+        metrics.inc('audits_total', mode='single', result='ok')
+        yield report + (format_timings(timings) if show_timings else '')
+        return
+
     yield "🤖 Analyzing with GPT-4o..."
     try:
-        analysis = analyze_with_ai(data)
-        yield format_analysis(analysis)
+        renderer = IncrementalRenderer()
+        html = None
+        rendering = 0.0
+        for delta in stream_analysis(data, scores, timings):
+            start = time.perf_counter()
+            html = renderer.feed(delta)
+            rendering += time.perf_counter() - start
+            yield html
+        record_stage('render', rendering, timings)  # once per audit, not per chunk
+        metrics.inc('audits_total', mode='single', result='ok')
+        yield (html or format_analysis(None)) + (format_timings(timings) if show_timings else '')
     except Exception as e:
+        metrics.inc('audits_total', mode='single', result='error')
         yield f"❌ Error during AI analysis: {str(e)}"
 
+def format_job_progress(batch, jobs):
+    done = sum(1 for j in jobs if j['status'] == 'done')
+    failed = sum(1 for j in jobs if j['status'] == 'failed')
+    active = [j for j in jobs if j['status'] not in FINISHED]
+    finished = sorted((j for j in jobs if j['status'] in FINISHED), key=lambda j: j['updated_at'])
+    rows = ''.join(
+        f"<tr><td>{escape(j['url'])}</td>"
+        f"<td>{j['score'] if j['status'] == 'done' else '❌ ' + escape(j['error'] or '')}</td>"
+        f"<td>{j['attempts']}</td></tr>"
+        for j in reversed(finished[-50:])
+    )
+    return f'''
+<div style="font-family: Arial, sans-serif; padding: 20px; background: #121212; color: #F5F5F5; border-radius: 10px;">
+    <h3 style="color: #2196F3;">📦 Batch {escape(batch)}: {done + failed}/{len(jobs)} audited · {failed} failed · {len(active)} queued or running</h3>
+    <table style="width: 100%;"><tr><th>URL</th><th>Overall</th><th>Attempts</th></tr>{rows}</table>
+</div>
+'''
+
+def export_batch(batch):
+    fd, output_path = tempfile.mkstemp(prefix=f'audit_{batch}_', suffix='.jsonl')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for job in get_queue().batch_jobs(batch, results=True):
+            record = {'url': job['url'], 'ok': job['status'] == 'done', 'error': job['error'], 'attempts': job['attempts']}
+            f.write(json.dumps({**record, **(job['result'] or {})}, ensure_ascii=False) + '\n')
+    return output_path
+
+# Job Status (polls the durable queue; safe to reopen after a reload or restart)
+def watch_batch(batch):
+    batch = batch.strip()
+    get_worker()
+    jobs = get_queue().batch_jobs(batch)
+    if not jobs:
+        yield "❌ Unknown batch ID.", None
+        return
+    while any(j['status'] not in FINISHED for j in jobs):
+        yield format_job_progress(batch, jobs), None
+        time.sleep(POLL_INTERVAL)
+        jobs = get_queue().batch_jobs(batch)
+    yield format_job_progress(batch, jobs), export_batch(batch)
+
+# Bulk Workflow (URL list and/or sitemap.xml, queued as jobs)
+def bulk_audit(urls_text, scores_only=False, measure=False):
+    if not urls_text.strip():
+        yield "Please enter at least one URL or sitemap.", None, ""
+        return
+
+    yield "🗺️ Collecting URLs...", None, ""
+    urls = load_urls(urls_text)
+    if not urls:
+        yield "❌ No URLs found. Please check the list or sitemap.", None, ""
+        return
+
+    batch, _ = get_queue().submit(urls, scores_only=scores_only, measure=measure)
+    for progress, output_path in watch_batch(batch):
+        yield progress, output_path, batch
+
+# Site Crawl Workflow (same-domain pages, one aggregated report)
+async def crawl_website(url, max_pages, max_depth):
+    if not url.strip():
+        yield "Please enter a website URL."
+        return
+    if not url.startswith('http'):
+        url = 'https://' + url.strip()
+
+    yield "🕷️ Reading robots.txt and starting crawl..."
+    summary = None
+    async for summary in crawl(url, max_pages=int(max_pages), max_depth=int(max_depth)):
+        yield format_site_report(summary)
+    if summary:
+        yield format_site_report(summary, finished=True)
+
 # Custom CSS (Fix double scrollbar + improve visuals)
 css = """
 #component-1 {
@@ -116,30 +143,77 @@ h1 {
 }
 """
 
-# Gradio Interface
-with gr.Blocks(css=css) as interface:
-    gr.HTML("<h1 style='text-align: center; color: white;'>🤖 AI Website Auditor – Built By Div ❤️</h1>")
-    gr.Markdown("Enter any website to audit **SEO**, **accessibility**, and **performance** using GPT-4o.")
-
-    with gr.Row():
-        url_input = gr.Textbox(label="🌐 Website URL", placeholder="example.com", lines=1)
-    
-    result_output = gr.HTML(label="📋 Analysis Results", elem_id="component-1")
-
-    submit_btn = gr.Button("🚀 Run Audit")
-
-    submit_btn.click(fn=audit_website, inputs=url_input, outputs=result_output)
-
-    gr.Examples(
-        [["google.com"], ["wikipedia.org"], ["bbc.com"]],
-        inputs=url_input
-    )
-
-interface.queue()
-
-if __name__ == "__main__":
+# Gradio Interface (built only when the UI is launched)
+def build_interface():
+    import gradio as gr
+
+    with gr.Blocks(css=css) as interface:
+        gr.HTML("<h1 style='text-align: center; color: white;'>🤖 AI Website Auditor – Built By Div ❤️</h1>")
+        gr.Markdown("Enter any website to audit **SEO**, **accessibility**, and **performance** using GPT-4o.")
+
+        with gr.Tab("Single Audit"):
+            with gr.Row():
+                url_input = gr.Textbox(label="🌐 Website URL", placeholder="example.com", lines=1)
+
+            result_output = gr.HTML(label="📋 Analysis Results", elem_id="component-1")
+
+            with gr.Row():
+                scores_only_input = gr.Checkbox(label="⚡ Scores only (skip GPT-4o)", value=False)
+                show_timings_input = gr.Checkbox(label="⏱️ Show timing breakdown", value=False)
+            submit_btn = gr.Button("🚀 Run Audit")
+
+            submit_btn.click(
+                fn=audit_website,
+                inputs=[url_input, scores_only_input, show_timings_input],
+                outputs=result_output
+            )
+
+            gr.Examples(
+                [["google.com"], ["wikipedia.org"], ["bbc.com"]],
+                inputs=url_input
+            )
+
+        with gr.Tab("Bulk Audit"):
+            urls_input = gr.Textbox(
+                label="🌐 URLs or sitemap.xml (one per line)",
+                placeholder="example.com\nhttps://example.com/sitemap.xml",
+                lines=8
+            )
+            with gr.Row():
+                bulk_scores_only_input = gr.Checkbox(label="⚡ Scores only (skip GPT-4o)", value=True)
+                bulk_measure_input = gr.Checkbox(label="📦 Measure page weight (probe sub-resources)", value=False)
+            bulk_btn = gr.Button("📦 Run Bulk Audit")
+            with gr.Row():
+                batch_input = gr.Textbox(label="🧾 Batch ID (reopen a queued or finished batch)", lines=1)
+                status_btn = gr.Button("🔄 Check Status")
+            bulk_output = gr.HTML(label="📋 Progress")
+            bulk_file = gr.File(label="📄 Results (JSON lines)")
+
+            bulk_btn.click(fn=bulk_audit, inputs=[urls_input, bulk_scores_only_input, bulk_measure_input], outputs=[bulk_output, bulk_file, batch_input])
+            status_btn.click(fn=watch_batch, inputs=batch_input, outputs=[bulk_output, bulk_file])
+
+        with gr.Tab("Site Crawl"):
+            crawl_input = gr.Textbox(label="🌐 Start URL", placeholder="example.com", lines=1)
+            with gr.Row():
+                max_pages_input = gr.Slider(10, 10000, value=200, step=10, label="📄 Max pages")
+                max_depth_input = gr.Slider(1, 10, value=3, step=1, label="🔗 Max link depth")
+            crawl_btn = gr.Button("🕷️ Crawl Site")
+            crawl_output = gr.HTML(label="📋 Site Report")
+
+            crawl_btn.click(fn=crawl_website, inputs=[crawl_input, max_pages_input, max_depth_input], outputs=crawl_output)
+
+    return interface.queue()
+
+def launch(**kwargs):
     print("Launching AI Website Auditor...")
     print("Visit the interface at http://localhost:7860")
     print("Press Ctrl+C to stop the server.")
     print("Built with ❤️  - By Div")
-    interface.launch()
+    metrics_port = int(os.getenv('METRICS_PORT', '9811'))
+    if metrics_port and serve_metrics(metrics_port, host=os.getenv('METRICS_HOST', '127.0.0.1')):
+        print(f"Prometheus metrics at http://localhost:{metrics_port}/metrics")
+    get_worker()
+    build_interface().launch(**kwargs)
+
+if __name__ == "__main__":
+    launch()
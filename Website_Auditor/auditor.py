@@ -0,0 +1,231 @@
+# auditor.py - Headless audit core (no UI imports; shared by app.py, cli.py and api.py)
+
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+from requests.exceptions import InvalidURL, InvalidSchema, MissingSchema
+from extractor import fetch_page, download_page, DEFAULT_KEYS
+from scoring import score_page, format_scores
+from probe import probe_resources
+from cache import get_cache, cache_key
+from metrics import metrics, timed, record_stage
+
+# The LLM gateway (pooled client, rate limiter, request coalescing) is shared with Wiki-Builder;
+# it lives at the repository root, so the auditor needs the whole checkout (see README)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_gateway import get_gateway
+
+# Load API key
+load_dotenv()
+
+class PermanentAuditError(ValueError):
+    """An audit a retry cannot fix: the page answers with a 4xx or the URL is malformed"""
+
+RETRYABLE_STATUS = (408, 425, 429)
+
+# Website Scraper Function
+def scrape_website(url, timings=None, parser=None, raise_errors=False):
+    """
+    Fetches and parses a page, revalidating cached features when possible.
+
+    By default the page is parsed while it streams in. A `parser` callable
+    (body, encoding) -> (features, parse_seconds) downloads the body first and
+    hands it over instead, e.g. to a process pool so parsing never holds this
+    process's GIL.
+
+    Failures return None, or with `raise_errors` are raised (as
+    PermanentAuditError when retrying cannot help).
+    """
+    try:
+        cache = get_cache()
+        page = cache.get_page(url) if cache else None
+        if page and not DEFAULT_KEYS <= page['features'].keys():
+            page = None  # cached by an older extractor; refetch to get every feature
+        headers = cache.conditional_headers(page) if cache else None
+
+        stats = {}
+        start = time.perf_counter()
+        if parser is None:
+            status, response_headers, data = fetch_page(url, headers=headers, stats=stats)
+        else:
+            status, response_headers, body, encoding = download_page(url, headers=headers)
+            data, stats['parse'] = parser(body, encoding) if body is not None else (None, 0.0)
+        record_stage('parse', stats.get('parse', 0.0), timings)
+        record_stage('fetch', time.perf_counter() - start - stats.get('parse', 0.0), timings)
+
+        # Error pages are a failed audit (as in the crawler), never scored or cached
+        if status >= 400:
+            permanent = status < 500 and status not in RETRYABLE_STATUS
+            raise (PermanentAuditError if permanent else ValueError)(f"HTTP {status} for {url}")
+
+        if status == 304 and page:
+            data = page['features']
+            metrics.inc('audit_cache_total', cache='page', result='revalidated')
+        elif cache:
+            metrics.inc('audit_cache_total', cache='page', result='miss')
+        if data and status != 304:
+            metrics.observe('audit_response_bytes', data['html_bytes'])
+        if cache and data:
+            cache.put_page(url, response_headers, data, previous=page)
+        return data
+    except Exception as e:
+        metrics.inc('audit_errors_total', stage='fetch')
+        print(f"[Scrape Error] {e}")
+        if raise_errors:
+            if isinstance(e, (InvalidURL, InvalidSchema, MissingSchema)):
+                raise PermanentAuditError(str(e)) from e
+            raise
+        return None
+
+MODEL = "gpt-4o"
+
+# Sub-resource probe (measured page weight for the Performance category)
+def measure_assets(url, data, timings=None):
+    try:
+        with timed('probe', timings):
+            data['probe'] = probe_resources(url, data['resources'], base=data['resource_base'])
+    except Exception as e:
+        print(f"[Probe Error] {e}")
+    return data
+
+def format_probe(probe):
+    if not probe:
+        return "Sub-resources: not measured"
+    ttfb = f"{probe['median_ttfb'] * 1000:.0f} ms" if probe['median_ttfb'] is not None else 'n/a'
+    return (
+        f"Sub-resources: {probe['probed']} of {probe['assets']} measured ({probe['timed_out']} timed out), "
+        f"{probe['total_bytes'] // 1024} KB total, {probe['uncompressed_text']} text assets uncompressed, "
+        f"{probe['uncached']} without cache headers, median TTFB {ttfb}"
+    )
+
+# GPT-4o Prompt (scores are computed locally; the model only writes the narrative)
+def build_prompt(data, scores):
+    categories = scores['categories']
+    rule_findings = '\n'.join(
+        f"- [{f['category']}] {f['finding']} (fix: {f['recommendation']})" for f in scores['findings']
+    ) or '- None'
+    return f"""
+Act as a professional SEO auditor. The scores below were computed by a rule-based engine.
+Copy them exactly as given, and turn the rule findings into a clear, structured report.
+
+Title: {data['title']}
+Description: {data['description'][:500]}...
+H1 tags: {data['h1_count']}
+Images missing alt: {data['img_without_alt']} of {data['img_count']}
+Language: {data['lang'] or 'not declared'}
+Canonical: {data['canonical'] or 'none'}
+Unlabelled form controls: {data['unlabelled_controls']} of {data['form_controls']}
+HTML size: {data['html_bytes'] // 1024} KB, external scripts: {data['external_scripts']}, stylesheets: {data['stylesheet_count']}
+{format_probe(data.get('probe'))}
+
+Rule findings (most points lost first):
+{rule_findings}
+
+Format:
+
+OVERALL SCORE: {scores['overall']}/100
+
+CATEGORY SCORES:
+• SEO: {categories['SEO']}/100
+• Accessibility: {categories['Accessibility']}/100
+• Performance: {categories['Performance']}/100
+
+KEY FINDINGS:
+• [finding 1]
+• [finding 2]
+• [finding 3]
+
+TOP RECOMMENDATIONS:
+🔴 HIGH PRIORITY: ...
+🟡 MEDIUM PRIORITY: ...
+🔵 LOW PRIORITY: ...
+"""
+
+SCORE_BUCKET = 5
+
+def analysis_key(data, scores):
+    """
+    Cache key for an analysis: the page's own features, scores rounded to
+    SCORE_BUCKET points and the findings. Live probe figures (TTFB, byte
+    totals, timeouts) change on every measured audit, so they are left out.
+    """
+    features = {name: value for name, value in data.items() if name != 'probe'}
+    bucket = lambda score: SCORE_BUCKET * round(score / SCORE_BUCKET)
+    stable = {
+        'overall': bucket(scores['overall']),
+        'categories': {name: bucket(score) for name, score in scores['categories'].items()},
+        'findings': sorted(f['finding'] for f in scores['findings']),
+    }
+    return cache_key(MODEL, json.dumps(features, sort_keys=True, default=str), json.dumps(stable, sort_keys=True))
+
+# GPT-4o Analysis Function (streamed; served from cache while the page and its scores are unchanged)
+def stream_analysis(data, scores=None, timings=None):
+    scores = scores or score_page(data)
+    prompt = build_prompt(data, scores)
+    cache = get_cache()
+    key = analysis_key(data, scores)
+    if cache:
+        cached = cache.get_analysis(key)
+        metrics.inc('audit_cache_total', cache='analysis', result='hit' if cached else 'miss')
+        if cached:
+            yield cached
+            return
+
+    # Only the waits for the next delta count as 'llm', not the time the consumer spends between them
+    start = time.perf_counter()
+    waited = 0.0
+    parts = []
+    try:
+        # Analyses are already memoized in the audit cache, so the gateway's own cache is skipped
+        stream = iter(get_gateway().stream([{"role": "user", "content": prompt}], model=MODEL, cache=False))
+        while True:
+            before = time.perf_counter()
+            try:
+                delta = next(stream)
+            except StopIteration:
+                break
+            finally:
+                waited += time.perf_counter() - before
+            if not parts:
+                metrics.observe('audit_llm_first_token_seconds', time.perf_counter() - start)
+            parts.append(delta)
+            yield delta
+    except Exception:
+        metrics.inc('audit_errors_total', stage='llm')
+        raise
+    finally:
+        record_stage('llm', waited, timings)
+
+    analysis = ''.join(parts)
+    if cache and analysis:
+        cache.put_analysis(key, analysis)
+
+def analyze_with_ai(data, scores=None, timings=None):
+    return ''.join(stream_analysis(data, scores, timings))
+
+# Single URL audit (raises instead of yielding status text; used by batch, CLI and API)
+def audit_url(url, scores_only=False, measure=True, mode='batch', parser=None):
+    timings = {}
+    try:
+        data = scrape_website(url, timings, parser=parser, raise_errors=True)
+    except Exception:
+        metrics.inc('audits_total', mode=mode, result='error')
+        raise
+    if not data:
+        metrics.inc('audits_total', mode=mode, result='error')
+        raise ValueError("Failed to scrape website")
+    if measure:
+        data = measure_assets(url, data, timings)
+    with timed('score', timings):
+        scores = score_page(data)
+    analysis = format_scores(scores) if scores_only else analyze_with_ai(data, scores, timings)
+    metrics.inc('audits_total', mode=mode, result='ok')
+    return {
+        'data': data,
+        'scores': scores,
+        'analysis': analysis,
+        'timings': {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    }
+
@@ -0,0 +1,245 @@
+"""
+Offline end-to-end benchmark for the audit pipeline.
+
+Serves a generated HTML corpus (small, large and pathological pages) from a
+local HTTP server, points the OpenAI client at a local stub endpoint with
+configurable latency, then measures per-stage latency, peak memory and
+URLs/second at several concurrency levels, plus parse throughput of the
+job worker's process pool at 1, 2 and all cores. Results are written as JSON so
+runs on different commits can be compared with --compare.
+
+    python benchmarks/bench_audit.py
+    python benchmarks/bench_audit.py --concurrency 1,8,32 --llm-latency 0.5
+    python benchmarks/bench_audit.py --compare benchmarks/results/old.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from fixtures import build_corpus
+from servers import serve, make_site_handler, make_llm_handler
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline Website Auditor benchmark")
+    parser.add_argument('--iterations', type=int, default=5, help="runs per fixture for stage timings")
+    parser.add_argument('--concurrency', default='1,4,16', help="comma-separated batch concurrency levels")
+    parser.add_argument('--urls', type=int, default=60, help="URLs per throughput run")
+    parser.add_argument('--llm-latency', type=float, default=0.3, help="stub LLM time to first token (s)")
+    parser.add_argument('--llm-tps', type=float, default=400, help="stub LLM tokens per second")
+    parser.add_argument('--scores-only', action='store_true', help="skip the LLM stage in throughput runs")
+    parser.add_argument('--output', help="result JSON path (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--compare', help="previous result JSON to diff against")
+    return parser.parse_args()
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'mean_ms': round(1000 * statistics.fmean(samples), 3),
+        'p50_ms': round(1000 * samples[len(samples) // 2], 3),
+        'p95_ms': round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'max_ms': round(1000 * samples[-1], 3),
+    }
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+# Per-stage Latency
+def bench_stages(auditor, corpus, site_url, iterations):
+    from extractor import extract_from_chunks, CHUNK_SIZE
+    from render import IncrementalRenderer
+    from scoring import score_page
+
+    stages = {}
+    def record(stage, kind, seconds):
+        stages.setdefault(stage, {}).setdefault(kind, []).append(seconds)
+
+    for path, (kind, body) in corpus.items():
+        chunks = [body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+        for _ in range(iterations):
+            _, seconds = timed(extract_from_chunks, chunks)
+            record('parse', kind, seconds)
+
+            data, seconds = timed(auditor.scrape_website, site_url + path)
+            record('fetch_parse', kind, seconds)
+            if not data:
+                continue
+
+            data, seconds = timed(auditor.measure_assets, site_url + path, data)
+            record('probe', kind, seconds)
+
+            scores, seconds = timed(score_page, data)
+            record('score', kind, seconds)
+
+            start = time.perf_counter()
+            renderer = IncrementalRenderer()
+            first = None
+            render_time = 0.0
+            for delta in auditor.stream_analysis(data, scores):
+                if first is None:
+                    first = time.perf_counter() - start
+                t = time.perf_counter()
+                renderer.feed(delta)
+                render_time += time.perf_counter() - t
+            record('llm_first_token', kind, first or 0.0)
+            record('llm_total', kind, time.perf_counter() - start)
+            record('render_incremental', kind, render_time)
+
+    return {
+        stage: {kind: summarize(samples) for kind, samples in by_kind.items()}
+        for stage, by_kind in stages.items()
+    }
+
+# Peak Memory (separate traced pass, since tracemalloc slows everything it watches)
+def bench_memory(auditor, corpus, site_url):
+    from scoring import score_page
+    from render import format_analysis
+
+    peaks = {}
+    tracemalloc.start()
+    for path, (kind, _) in corpus.items():
+        tracemalloc.reset_peak()
+        data = auditor.scrape_website(site_url + path)
+        if data:
+            scores = score_page(data)
+            format_analysis(auditor.analyze_with_ai(data, scores))
+        peak = tracemalloc.get_traced_memory()[1]
+        peaks[path.strip('/')] = round(peak / 2**20, 2)
+    tracemalloc.stop()
+    return peaks
+
+# Batch Throughput
+def bench_throughput(auditor, corpus, site_url, levels, url_count, scores_only):
+    from batch import run_batch
+
+    paths = list(corpus)
+    results = []
+    for level in levels:
+        urls = [f"{site_url}{paths[i % len(paths)]}?run={level}-{i}" for i in range(url_count)]
+        audit_fn = partial(auditor.audit_url, scores_only=scores_only, measure=True)
+        start = time.perf_counter()
+        failed = sum(1 for r in run_batch(urls, audit_fn, max_workers=level) if not r['ok'])
+        seconds = time.perf_counter() - start
+        results.append({
+            'concurrency': level,
+            'urls': url_count,
+            'failed': failed,
+            'seconds': round(seconds, 3),
+            'urls_per_sec': round(url_count / seconds, 2),
+        })
+        print(f"  concurrency {level:>3}: {url_count / seconds:7.2f} URLs/s ({failed} failed)")
+    return results
+
+# Parse Throughput across processes (the job worker's parse tier)
+def bench_parse_pool(corpus, pages=64):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from extractor import parse_page
+
+    bodies = [body for kind, body in corpus.values() if kind != 'small'] or [body for _, body in corpus.values()]
+    work = [bodies[i % len(bodies)] for i in range(pages)]
+    results = []
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(parse_page, bodies))  # warm up the worker processes
+            start = time.perf_counter()
+            list(pool.map(parse_page, work))
+            seconds = time.perf_counter() - start
+        results.append({'processes': workers, 'pages': pages, 'pages_per_sec': round(pages / seconds, 2)})
+        print(f"  {workers:>3} processes: {pages / seconds:7.2f} pages/s")
+    return results
+
+def compare(previous, current):
+    print(f"\nComparison vs {previous.get('commit')} ({previous.get('timestamp')}):")
+    for stage, by_kind in current['stages'].items():
+        for kind, stats in by_kind.items():
+            old = previous.get('stages', {}).get(stage, {}).get(kind)
+            if old:
+                change = 100 * (stats['p50_ms'] - old['p50_ms']) / old['p50_ms'] if old['p50_ms'] else 0.0
+                print(f"  {stage:<20} {kind:<13} p50 {old['p50_ms']:>10.2f} → {stats['p50_ms']:>10.2f} ms ({change:+.1f}%)")
+    old_tp = {r['concurrency']: r for r in previous.get('throughput', [])}
+    for row in current['throughput']:
+        old = old_tp.get(row['concurrency'])
+        if old:
+            change = 100 * (row['urls_per_sec'] - old['urls_per_sec']) / old['urls_per_sec']
+            print(f"  throughput x{row['concurrency']:<4} {old['urls_per_sec']:>8.2f} → {row['urls_per_sec']:>8.2f} URLs/s ({change:+.1f}%)")
+    old_pool = {r['processes']: r for r in previous.get('parse_pool', [])}
+    for row in current['parse_pool']:
+        old = old_pool.get(row['processes'])
+        if old:
+            change = 100 * (row['pages_per_sec'] - old['pages_per_sec']) / old['pages_per_sec']
+            print(f"  parse x{row['processes']:<4} {old['pages_per_sec']:>13.2f} → {row['pages_per_sec']:>8.2f} pages/s ({change:+.1f}%)")
+
+def main():
+    args = parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+    corpus = build_corpus()
+
+    _, site_url = serve(make_site_handler(corpus))
+    _, llm_url = serve(make_llm_handler(args.llm_latency, args.llm_tps))
+
+    # Everything must be configured before the auditor creates its clients
+    os.environ['OPENAI_BASE_URL'] = llm_url + '/v1'
+    os.environ['OPENAI_API_KEY'] = 'benchmark'
+    os.environ['AUDIT_CACHE'] = '0'
+    os.environ.update({'LLM_CACHE': '0', 'LLM_RPM': '0', 'LLM_TPM': '0'})  # measure the pipeline, not the gateway's limits
+    import auditor
+
+    print(f"Benchmarking {len(corpus)} fixtures, {args.iterations} iterations each...")
+    stages = bench_stages(auditor, corpus, site_url, args.iterations)
+
+    print("Peak memory per fixture...")
+    peaks = bench_memory(auditor, corpus, site_url)
+
+    print("Batch throughput:")
+    throughput = bench_throughput(auditor, corpus, site_url, levels, args.urls, args.scores_only)
+
+    print("Parse throughput (process pool):")
+    parse_pool = bench_parse_pool(corpus)
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'fixtures': {path: {'kind': kind, 'bytes': len(body)} for path, (kind, body) in corpus.items()},
+        'stages': stages,
+        'throughput': throughput,
+        'parse_pool': parse_pool,
+        'memory': {
+            'peak_traced_mb': peaks,
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        },
+    }
+
+    output = args.output or os.path.join(HERE, 'results', f"{result['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import random
+
+# HTML Fixture Corpus
+#
+# Pages are generated deterministically in memory so the corpus never has to be
+# committed; the same seed always yields byte-identical fixtures.
+
+ASSET_SIZES = {
+    '/assets/app.js': 120_000,
+    '/assets/vendor.js': 300_000,
+    '/assets/site.css': 40_000,
+    '/assets/hero.jpg': 250_000,
+    '/assets/thumb.png': 8_000,
+}
+
+HEAD = (
+    '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+    '<title>{title}</title><meta name="description" content="{description}">'
+    '<meta name="viewport" content="width=device-width, initial-scale=1">'
+    '<link rel="canonical" href="/"><meta property="og:title" content="{title}">'
+    '<link rel="stylesheet" href="/assets/site.css"><script src="/assets/app.js"></script>'
+    '</head><body>'
+)
+
+def paragraph(rng, words=60):
+    vocab = ['audit', 'website', 'performance', 'content', 'search', 'render', 'image', 'layout', 'speed', 'cache']
+    return '<p>' + ' '.join(rng.choice(vocab) for _ in range(words)) + '</p>'
+
+def small_page(rng):
+    body = '<h1>Small page</h1>' + paragraph(rng) + '<img src="/assets/thumb.png" alt="thumb">'
+    return HEAD.format(title='Small benchmark page', description='A small page. ' * 5) + body + '</body></html>'
+
+def large_page(rng, sections=400):
+    parts = [HEAD.format(title='Large benchmark page', description='A large page. ' * 8), '<h1>Large page</h1>']
+    for i in range(sections):
+        parts.append(f'<h2>Section {i}</h2>')
+        parts.append(paragraph(rng, 120))
+        parts.append(f'<a href="/page/{i}">Read more {i}</a>')
+        parts.append('<img src="/assets/hero.jpg">' if i % 3 else '<img src="/assets/thumb.png" alt="t">')
+        parts.append('<form><label for="q{0}">Search</label><input id="q{0}"><input name="x{0}"></form>'.format(i))
+    parts.append('<script src="/assets/vendor.js"></script></body></html>')
+    return ''.join(parts)
+
+def deep_nesting_page(rng, depth=20_000):
+    return HEAD.format(title='Deep nesting', description='') + '<div>' * depth + 'x' + '</body></html>'
+
+def huge_inline_script_page(rng, size=1_500_000):
+    return HEAD.format(title='Inline script', description='x') + '<script>' + 'var a=1;' * (size // 8) + '</script></body></html>'
+
+def over_cap_page(rng, size=5_000_000):
+    filler = paragraph(rng, 200)
+    return HEAD.format(title='Over the byte cap', description='x') + filler * (size // len(filler)) + '</body></html>'
+
+def tag_soup_page(rng, count=50_000):
+    tags = ['<img src=a>', '<h3>', '</h1>', '<a href=#>', '<input>', '<label>', '<p', '<<>>', '&amp;&bogus;', '</label>']
+    return '<html><title>Tag soup' + ''.join(rng.choice(tags) for _ in range(count))
+
+def binary_garbage_page(rng, size=500_000):
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+FIXTURES = {
+    'small': (small_page, 'small'),
+    'large': (large_page, 'large'),
+    'deep_nesting': (deep_nesting_page, 'pathological'),
+    'huge_inline_script': (huge_inline_script_page, 'pathological'),
+    'over_byte_cap': (over_cap_page, 'pathological'),
+    'tag_soup': (tag_soup_page, 'pathological'),
+    'binary_garbage': (binary_garbage_page, 'pathological'),
+}
+
+def build_corpus(seed=1234):
+    """Returns {path: (kind, body_bytes)} for every fixture page"""
+    corpus = {}
+    for name, (factory, kind) in FIXTURES.items():
+        body = factory(random.Random(seed))
+        corpus[f'/{name}.html'] = (kind, body if isinstance(body, bytes) else body.encode('utf-8'))
+    return corpus
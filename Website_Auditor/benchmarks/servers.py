@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from fixtures import ASSET_SIZES
+
+STUB_REPORT = """OVERALL SCORE: 80/100
+
+CATEGORY SCORES:
+• SEO: 80/100
+• Accessibility: 75/100
+• Performance: 85/100
+
+KEY FINDINGS:
+• **Benchmark** finding one about the page title and description.
+• Finding two about images that are missing alt text.
+• Finding three about render-blocking scripts and page weight.
+
+TOP RECOMMENDATIONS:
+🔴 HIGH PRIORITY: Add descriptive alt text to every meaningful image.
+🟡 MEDIUM PRIORITY: Defer non-critical JavaScript.
+🔵 LOW PRIORITY: Add Open Graph tags for link previews.
+"""
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status, body, content_type, extra=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+# Fixture Site (HTML corpus + sized static assets)
+def make_site_handler(corpus):
+    assets = {path: b'x' * size for path, size in ASSET_SIZES.items()}
+
+    class SiteHandler(QuietHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path in corpus:
+                self.send_body(200, corpus[path][1], 'text/html; charset=utf-8')
+            elif path in assets:
+                content_type = 'application/javascript' if path.endswith('.js') else 'application/octet-stream'
+                self.send_body(200, assets[path], content_type, {'Cache-Control': 'max-age=3600'})
+            else:
+                self.send_body(404, b'not found', 'text/plain')
+
+        do_HEAD = do_GET
+
+    return SiteHandler
+
+# Stub OpenAI chat-completions endpoint
+def make_llm_handler(first_token_latency, tokens_per_second):
+    words = STUB_REPORT.split(' ')
+    tokens = [w + ' ' for w in words[:-1]] + [words[-1]]
+
+    class LLMHandler(QuietHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            time.sleep(first_token_latency)
+            if request.get('stream'):
+                self.stream(request)
+            else:
+                time.sleep(len(tokens) / tokens_per_second)
+                self.send_body(200, json.dumps({
+                    'id': 'bench', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': request.get('model', 'gpt-4o'),
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': STUB_REPORT}}],
+                    'usage': {'prompt_tokens': 300, 'completion_tokens': len(tokens), 'total_tokens': 300 + len(tokens)}
+                }).encode(), 'application/json')
+
+        def stream(self, request):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            delay = 1 / tokens_per_second
+            for token in tokens:
+                chunk = {
+                    'id': 'bench', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                    'model': request.get('model', 'gpt-4o'),
+                    'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return LLMHandler
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # probes close ranged GETs early; resets are expected
+
+def serve(handler):
+    """Starts a threaded local server on a free port; returns (server, base_url)"""
+    server = QuietServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
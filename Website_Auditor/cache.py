@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.audit_cache.sqlite3')
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+EVICT_EVERY = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    features TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+CREATE INDEX IF NOT EXISTS analyses_accessed ON analyses (accessed_at);
+"""
+
+def cache_key(*parts):
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+class AuditCache:
+    """
+    Persistent SQLite cache for page validators/features and model analyses.
+
+    Pages are keyed by URL and remember ETag/Last-Modified so they can be
+    revalidated with a conditional GET. Analyses are keyed by
+    auditor.analysis_key: the model, the page features (probe figures left
+    out) and the scores rounded to 5 points plus the rule findings. A change
+    to any feature, a finding, or a score moving into another bucket means a
+    new model call; live TTFB or byte totals do not. Both tables expire entries after `ttl` seconds and keep at most
+    `max_entries` rows, dropping the least recently used first.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def _get(self, table, column, value):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                f'SELECT * FROM {table} WHERE {column} = ? AND updated_at > ?',
+                (value, now - self.ttl)
+            ).fetchone()
+            if row:
+                self.db.execute(f'UPDATE {table} SET accessed_at = ? WHERE {column} = ?', (now, value))
+        return row
+
+    def _put(self, table, values):
+        now = time.time()
+        columns = ', '.join(values) + ', updated_at, accessed_at'
+        marks = ', '.join('?' * (len(values) + 2))
+        with self.lock:
+            self.db.execute(
+                f'INSERT OR REPLACE INTO {table} ({columns}) VALUES ({marks})',
+                (*values.values(), now, now)
+            )
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        for table in ('pages', 'analyses'):
+            self.db.execute(f'DELETE FROM {table} WHERE updated_at <= ?', (now - self.ttl,))
+            self.db.execute(
+                f'DELETE FROM {table} WHERE rowid IN '
+                f'(SELECT rowid FROM {table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    # Pages
+    def get_page(self, url):
+        row = self._get('pages', 'url', url)
+        if not row:
+            return None
+        return {'etag': row[1], 'last_modified': row[2], 'features': json.loads(row[3])}
+
+    def put_page(self, url, headers, features, previous=None):
+        # A 304 may omit the validators, so fall back to the ones we revalidated with
+        previous = previous or {}
+        self._put('pages', {
+            'url': url,
+            'etag': headers.get('ETag') or previous.get('etag'),
+            'last_modified': headers.get('Last-Modified') or previous.get('last_modified'),
+            'features': json.dumps(features, ensure_ascii=False)
+        })
+
+    def conditional_headers(self, page):
+        headers = {}
+        if page and page['etag']:
+            headers['If-None-Match'] = page['etag']
+        if page and page['last_modified']:
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    # Analyses
+    def get_analysis(self, key):
+        row = self._get('analyses', 'key', key)
+        return row[1] if row else None
+
+    def put_analysis(self, key, analysis):
+        self._put('analyses', {'key': key, 'analysis': analysis})
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM pages')
+            self.db.execute('DELETE FROM analyses')
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Returns the shared cache configured from AUDIT_CACHE_* env vars, or None if disabled"""
+    global _cache
+    if os.getenv('AUDIT_CACHE', '1') == '0':
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AuditCache(
+                path=os.getenv('AUDIT_CACHE_PATH', DEFAULT_PATH),
+                ttl=float(os.getenv('AUDIT_CACHE_TTL', DEFAULT_TTL)),
+                max_entries=int(os.getenv('AUDIT_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+            )
+    return _cache
@@ -0,0 +1,160 @@
+# cli.py - Headless command line for Website_Auditor
+#
+# Heavy modules (OpenAI SDK, Gradio) are imported only by the commands that
+# need them, so a one-off `python cli.py audit example.com --scores-only`
+# starts in a fraction of the time the Gradio app takes.
+
+import argparse
+import json
+import sys
+
+def cmd_audit(args):
+    from auditor import audit_url
+    from batch import normalize_url
+
+    url = normalize_url(args.url)
+    try:
+        result = audit_url(url, scores_only=args.scores_only, measure=not args.no_measure, mode='cli')
+    except Exception as e:
+        print(f"❌ {url}: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({'url': url, **result}, ensure_ascii=False, indent=2))
+    else:
+        print(result['analysis'])
+    return 0
+
+def cmd_batch(args):
+    from functools import partial
+    from auditor import audit_url
+    from batch import load_urls, run_batch
+
+    text = sys.stdin.read() if args.source == '-' else open(args.source, encoding='utf-8').read()
+    urls = load_urls(text)
+    audit_fn = partial(audit_url, scores_only=not args.llm, measure=args.measure, mode='cli')
+    failed = 0
+    for done, result in enumerate(run_batch(urls, audit_fn, max_workers=args.concurrency, output_path=args.output), 1):
+        failed += not result['ok']
+        status = result['scores']['overall'] if result['ok'] else f"❌ {result['error']}"
+        print(f"[{done}/{len(urls)}] {result['url']} {status} ({result['elapsed']}s)", file=sys.stderr)
+    print(f"✅ {len(urls) - failed}/{len(urls)} audited, results in {args.output}", file=sys.stderr)
+    return 1 if failed == len(urls) else 0
+
+def cmd_submit(args):
+    from batch import load_urls
+    from jobs import get_queue
+
+    text = sys.stdin.read() if args.source == '-' else open(args.source, encoding='utf-8').read()
+    batch, ids = get_queue().submit(load_urls(text), scores_only=not args.llm, measure=args.measure)
+    print(f"🧾 Queued {len(ids)} jobs as batch {batch}", file=sys.stderr)
+    print(batch)
+    return 0
+
+def cmd_jobs(args):
+    from jobs import get_queue
+
+    queue = get_queue()
+    if args.job:
+        job = queue.get(args.job)
+        print(json.dumps(job, ensure_ascii=False, indent=2) if job else f"❌ Unknown job {args.job}")
+        return 0 if job else 1
+    if not args.batch:
+        print("❌ Give a batch ID or --job", file=sys.stderr)
+        return 2
+    for job in queue.batch_jobs(args.batch):
+        status = job['score'] if job['status'] == 'done' else job['status']
+        print(f"#{job['id']} {job['url']} {status} (attempts {job['attempts']}){' ' + job['error'] if job['error'] and job['status'] != 'done' else ''}")
+    print(json.dumps(queue.counts(args.batch)), file=sys.stderr)
+    return 0
+
+def cmd_worker(args):
+    import time
+    from jobs import JobWorker, get_queue
+
+    worker = JobWorker(get_queue(), concurrency=args.concurrency, parse_workers=args.parse_workers).start()
+    print(f"⚙️ Worker running ({args.concurrency} audits at once). Press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+    return 0
+
+def cmd_crawl(args):
+    import asyncio
+    from crawler import crawl
+    from batch import normalize_url
+
+    async def run():
+        summary = None
+        async for summary in crawl(normalize_url(args.url), max_pages=args.max_pages, max_depth=args.max_depth):
+            print(f"🕷️ {summary['pages_crawled']} pages crawled...", file=sys.stderr, end='\r')
+        return summary
+
+    print(json.dumps(asyncio.run(run()), ensure_ascii=False, indent=2))
+    return 0
+
+def cmd_serve(args):
+    from api import serve
+    serve(host=args.host, port=args.port)
+    return 0
+
+def cmd_ui(args):
+    from app import launch
+    launch()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description="AI Website Auditor (headless)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    audit = commands.add_parser('audit', help="audit a single URL")
+    audit.add_argument('url')
+    audit.add_argument('--scores-only', action='store_true', help="skip GPT-4o and print the local report")
+    audit.add_argument('--no-measure', action='store_true', help="do not probe scripts, stylesheets and images")
+    audit.add_argument('--json', action='store_true', help="print the full result as JSON")
+    audit.set_defaults(func=cmd_audit)
+
+    batch = commands.add_parser('batch', help="audit a file of URLs / sitemap.xml links ('-' for stdin)")
+    batch.add_argument('source')
+    batch.add_argument('--output', default='audit_results.jsonl', help="JSON lines file results are appended to")
+    batch.add_argument('--concurrency', type=int, default=8)
+    batch.add_argument('--llm', action='store_true', help="also write the GPT-4o narrative (scores only by default)")
+    batch.add_argument('--measure', action='store_true', help="probe sub-resources for page weight")
+    batch.set_defaults(func=cmd_batch)
+
+    submit = commands.add_parser('submit', help="queue a file of URLs / sitemap.xml links as jobs; prints the batch ID")
+    submit.add_argument('source')
+    submit.add_argument('--llm', action='store_true', help="also write the GPT-4o narrative (scores only by default)")
+    submit.add_argument('--measure', action='store_true', help="probe sub-resources for page weight")
+    submit.set_defaults(func=cmd_submit)
+
+    jobs = commands.add_parser('jobs', help="show the status of a queued batch (or one job with --job)")
+    jobs.add_argument('batch', nargs='?')
+    jobs.add_argument('--job', type=int)
+    jobs.set_defaults(func=cmd_jobs)
+
+    worker = commands.add_parser('worker', help="process queued jobs (run several for more throughput)")
+    worker.add_argument('--concurrency', type=int, default=8, help="audits in flight at once")
+    worker.add_argument('--parse-workers', type=int, default=None, help="parse processes (default: one per core)")
+    worker.set_defaults(func=cmd_worker)
+
+    crawl = commands.add_parser('crawl', help="crawl a site and print the aggregated report as JSON")
+    crawl.add_argument('url')
+    crawl.add_argument('--max-pages', type=int, default=200)
+    crawl.add_argument('--max-depth', type=int, default=3)
+    crawl.set_defaults(func=cmd_crawl)
+
+    serve = commands.add_parser('serve', help="run the JSON HTTP API")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.set_defaults(func=cmd_serve)
+
+    ui = commands.add_parser('ui', help="launch the Gradio interface")
+    ui.set_defaults(func=cmd_ui)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
+from net import get_session, USER_AGENT
+from extractor import fetch_page, DEFAULT_FEATURES, Links
+
+CRAWL_FEATURES = DEFAULT_FEATURES + [Links]
+SKIP_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico',
+    '.css', '.js', '.json', '.xml', '.mp3', '.mp4', '.avi', '.mov', '.woff', '.woff2'
+)
+MAX_EXAMPLES = 10
+PROGRESS_INTERVAL = 0.5
+
+def site_key(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def normalize_link(base, href):
+    url = urldefrag(urljoin(base, href))[0]
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    return parsed._replace(netloc=parsed.netloc.lower(), path=parsed.path or '/').geturl()
+
+# robots.txt
+def load_robots(start_url):
+    robots = RobotFileParser()
+    try:
+        response = get_session().get(urljoin(start_url, '/robots.txt'), timeout=10)
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            robots.allow_all = True
+        else:
+            robots.parse(response.text.splitlines())
+    except Exception as e:
+        print(f"[Robots Error] {e}")
+        robots.allow_all = True
+    return robots
+
+# Per-host Politeness
+class HostLimiter:
+    """Caps concurrent requests to one host and spaces their start times by `delay` seconds"""
+
+    def __init__(self, concurrency, delay):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            wait = self.next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.next_start = time.monotonic() + self.delay
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+# Aggregated Site Report (running totals only, so memory does not grow per page)
+class SiteReport:
+    def __init__(self, start_url):
+        self.start_url = start_url
+        self.started = time.monotonic()
+        self.pages = 0
+        self.failed = 0
+        self.skipped = 0
+        self.missing_title = 0
+        self.missing_description = 0
+        self.no_h1 = 0
+        self.multiple_h1 = 0
+        self.img_without_alt = 0
+        self.title_counts = Counter()
+        self.examples = {}
+        self.queued = 0
+
+    def example(self, issue, url):
+        urls = self.examples.setdefault(issue, [])
+        if len(urls) < MAX_EXAMPLES:
+            urls.append(url)
+
+    def add(self, url, data):
+        self.pages += 1
+        if data['title'] == 'No title':
+            self.missing_title += 1
+            self.example('Missing title', url)
+        else:
+            self.title_counts[hash(data['title'])] += 1
+        if data['description'] == 'No description':
+            self.missing_description += 1
+            self.example('Missing meta description', url)
+        if data['h1_count'] == 0:
+            self.no_h1 += 1
+            self.example('No <h1>', url)
+        elif data['h1_count'] > 1:
+            self.multiple_h1 += 1
+            self.example('Multiple <h1>', url)
+        if data['img_without_alt']:
+            self.img_without_alt += data['img_without_alt']
+            self.example('Images without alt', url)
+
+    def add_error(self, url, error):
+        self.failed += 1
+        self.example('Failed to fetch', f"{url} ({error})")
+
+    def share(self, count):
+        return round(100 * count / self.pages, 1) if self.pages else 0.0
+
+    def summary(self):
+        return {
+            'start_url': self.start_url,
+            'pages_crawled': self.pages,
+            'pages_failed': self.failed,
+            'pages_skipped': self.skipped,
+            'pages_queued': self.queued,
+            'elapsed': round(time.monotonic() - self.started, 1),
+            'missing_title_pct': self.share(self.missing_title),
+            'missing_description_pct': self.share(self.missing_description),
+            'no_h1_pct': self.share(self.no_h1),
+            'multiple_h1_pct': self.share(self.multiple_h1),
+            'duplicate_title_pages': sum(c for c in self.title_counts.values() if c > 1),
+            'total_img_without_alt': self.img_without_alt,
+            'examples': self.examples,
+        }
+
+# Same-domain Crawler
+async def crawl(start_url, max_pages=200, max_depth=3, concurrency=16, per_host=8, delay=0.05):
+    """
+    Crawls same-domain pages breadth-first from start_url, yielding the
+    running SiteReport summary every PROGRESS_INTERVAL seconds and once more
+    when the crawl is done.
+
+    The frontier and seen-set never hold more than max_pages URLs, and pages
+    are folded into the report as they are parsed, so memory is bounded by
+    max_pages rather than by the size of the site.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    get_session(pool_size=concurrency)
+
+    robots = await loop.run_in_executor(executor, load_robots, start_url)
+    crawl_delay = robots.crawl_delay(USER_AGENT) or 0
+    site = site_key(start_url)
+    limiters = {}
+    report = SiteReport(start_url)
+    frontier = asyncio.Queue()
+    seen = set()
+
+    def enqueue(url, depth):
+        if url in seen or len(seen) >= max_pages or site_key(url) != site:
+            return
+        seen.add(url)
+        if not robots.can_fetch(USER_AGENT, url):
+            report.skipped += 1
+            return
+        report.queued += 1
+        frontier.put_nowait((url, depth))
+
+    def limiter(url):
+        host = urlparse(url).netloc
+        if host not in limiters:
+            limiters[host] = HostLimiter(per_host, max(delay, float(crawl_delay)))
+        return limiters[host]
+
+    async def visit(url, depth):
+        try:
+            async with limiter(url):
+                status, headers, data = await loop.run_in_executor(
+                    executor, lambda: fetch_page(url, features=CRAWL_FEATURES, html_only=True)
+                )
+        except Exception as e:
+            report.add_error(url, e)
+            return
+        if status >= 400:
+            report.add_error(url, f"HTTP {status}")
+            return
+        if not data:
+            report.skipped += 1
+            return
+
+        links, base = data.pop('links'), data.pop('base_href')
+        report.add(url, data)
+        if depth < max_depth:
+            base = urljoin(url, base) if base else url
+            for href in links:
+                link = normalize_link(base, href)
+                if link:
+                    enqueue(link, depth + 1)
+
+    async def worker():
+        while True:
+            url, depth = await frontier.get()
+            try:
+                await visit(url, depth)
+            finally:
+                frontier.task_done()
+
+    enqueue(normalize_link(start_url, start_url) or start_url, 0)
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    done = asyncio.create_task(frontier.join())
+    try:
+        while not done.done():
+            await asyncio.wait({done}, timeout=PROGRESS_INTERVAL)
+            yield report.summary()
+    finally:
+        done.cancel()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, done, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,417 @@
+import codecs
+import os
+import sys
+import time
+from html.parser import HTMLParser
+from net import get_session
+
+# Charset detection is shared with Wiki-Builder (charsets.py at the repository root)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from charsets import declared_encoding, sniff_encoding
+
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Feature Collectors
+#
+# Each collector sees the parser events for the tags it lists in `tags` (plus
+# the text inside them when `text` is True) and contributes keys to the final
+# dict. Adding a signal means adding a collector here, never another pass.
+
+class Feature:
+    tags = ()
+    text = False
+
+    def start(self, tag, attrs):
+        pass
+
+    def end(self, tag):
+        pass
+
+    def data(self, text):
+        pass
+
+    def result(self):
+        return {}
+
+class Title(Feature):
+    tags = ('title',)
+    text = True
+
+    def __init__(self):
+        self.parts = None
+        self.inside = False
+
+    def start(self, tag, attrs):
+        if self.parts is None:
+            self.parts = []
+            self.inside = True
+
+    def end(self, tag):
+        self.inside = False
+
+    def data(self, text):
+        if self.inside:
+            self.parts.append(text)
+
+    def result(self):
+        title = ''.join(self.parts or []).strip()
+        return {'title': title or 'No title'}
+
+class MetaDescription(Feature):
+    tags = ('meta',)
+
+    def __init__(self):
+        self.description = None
+
+    def start(self, tag, attrs):
+        if self.description is None and attrs.get('name') == 'description':
+            self.description = (attrs.get('content') or '').strip()
+
+    def result(self):
+        return {'description': self.description or 'No description'}
+
+class H1Count(Feature):
+    tags = ('h1',)
+
+    def __init__(self):
+        self.count = 0
+
+    def start(self, tag, attrs):
+        self.count += 1
+
+    def result(self):
+        return {'h1_count': self.count}
+
+class ImageAlt(Feature):
+    tags = ('img',)
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+
+    def start(self, tag, attrs):
+        self.count += 1
+        if not attrs.get('alt'):
+            self.missing += 1
+
+    def result(self):
+        return {'img_without_alt': self.missing, 'img_count': self.count}
+
+class HeadingOutline(Feature):
+    """Counts headings and how often the outline skips a level (e.g. h2 -> h4)"""
+    tags = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self):
+        self.count = 0
+        self.skips = 0
+        self.previous = 0
+
+    def start(self, tag, attrs):
+        level = int(tag[1])
+        if self.previous and level > self.previous + 1:
+            self.skips += 1
+        self.previous = level
+        self.count += 1
+
+    def result(self):
+        return {'heading_count': self.count, 'heading_skips': self.skips}
+
+class HeadTags(Feature):
+    tags = ('html', 'meta', 'link')
+
+    def __init__(self):
+        self.lang = None
+        self.viewport = None
+        self.robots = None
+        self.canonical = None
+        self.og = set()
+        self.stylesheets = 0
+
+    def start(self, tag, attrs):
+        if tag == 'html':
+            self.lang = self.lang or (attrs.get('lang') or '').strip() or None
+        elif tag == 'meta':
+            name = (attrs.get('name') or '').lower()
+            prop = (attrs.get('property') or '').lower()
+            if name == 'viewport':
+                self.viewport = attrs.get('content') or ''
+            elif name == 'robots':
+                self.robots = (attrs.get('content') or '').lower()
+            elif prop.startswith('og:'):
+                self.og.add(prop)
+        else:
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'canonical' in rel and attrs.get('href'):
+                self.canonical = self.canonical or attrs['href']
+            if 'stylesheet' in rel:
+                self.stylesheets += 1
+
+    def result(self):
+        return {
+            'lang': self.lang,
+            'viewport': self.viewport,
+            'noindex': 'noindex' in (self.robots or ''),
+            'canonical': self.canonical,
+            'og_tags': sorted(self.og),
+            'stylesheet_count': self.stylesheets
+        }
+
+class FormLabels(Feature):
+    """Counts form controls that have no <label>, aria-label/labelledby or title"""
+    tags = ('label', 'input', 'select', 'textarea')
+    unlabelled_types = ('hidden', 'submit', 'button', 'image', 'reset')
+
+    def __init__(self):
+        self.label_depth = 0
+        self.label_for = set()
+        self.unlabelled_ids = []
+        self.controls = 0
+
+    def start(self, tag, attrs):
+        if tag == 'label':
+            self.label_depth += 1
+            if attrs.get('for'):
+                self.label_for.add(attrs['for'])
+            return
+        if tag == 'input' and (attrs.get('type') or 'text').lower() in self.unlabelled_types:
+            return
+        self.controls += 1
+        if not (self.label_depth or attrs.get('aria-label') or attrs.get('aria-labelledby') or attrs.get('title')):
+            # Resolved at the end, since <label for> may come after the control
+            self.unlabelled_ids.append(attrs.get('id') or '')
+
+    def end(self, tag):
+        if tag == 'label' and self.label_depth:
+            self.label_depth -= 1
+
+    def result(self):
+        missing = sum(1 for id_ in self.unlabelled_ids if not id_ or id_ not in self.label_for)
+        return {'form_controls': self.controls, 'unlabelled_controls': missing}
+
+class LinkCount(Feature):
+    tags = ('a',)
+
+    def __init__(self):
+        self.count = 0
+        self.empty = 0
+
+    def start(self, tag, attrs):
+        href = (attrs.get('href') or '').strip()
+        self.count += 1
+        if not href or href == '#' or href.lower().startswith('javascript:'):
+            self.empty += 1
+
+    def result(self):
+        return {'link_count': self.count, 'empty_links': self.empty}
+
+class Scripts(Feature):
+    tags = ('script', 'style')
+    text = True
+
+    def __init__(self):
+        self.external = 0
+        self.inline_script_bytes = 0
+        self.inline_style_bytes = 0
+        self.inside = None
+
+    def start(self, tag, attrs):
+        if tag == 'script' and attrs.get('src'):
+            self.external += 1
+        else:
+            self.inside = tag
+
+    def end(self, tag):
+        self.inside = None
+
+    def data(self, text):
+        if self.inside == 'script':
+            self.inline_script_bytes += len(text)
+        elif self.inside == 'style':
+            self.inline_style_bytes += len(text)
+
+    def result(self):
+        return {
+            'external_scripts': self.external,
+            'inline_script_bytes': self.inline_script_bytes,
+            'inline_style_bytes': self.inline_style_bytes
+        }
+
+class Links(Feature):
+    """Followable <a href> targets (used by the crawler, not part of the default audit)"""
+    tags = ('a', 'base')
+    max_links = 1000
+
+    def __init__(self):
+        self.base = None
+        self.links = []
+
+    def start(self, tag, attrs):
+        href = (attrs.get('href') or '').strip()
+        if not href:
+            return
+        if tag == 'base':
+            self.base = self.base or href
+        elif len(self.links) < self.max_links and 'nofollow' not in (attrs.get('rel') or '').lower():
+            self.links.append(href)
+
+    def result(self):
+        return {'links': self.links, 'base_href': self.base}
+
+class Resources(Feature):
+    """Sub-resources the browser will download: scripts, stylesheets and images"""
+    tags = ('script', 'link', 'img', 'base')
+    max_resources = 300
+
+    def __init__(self):
+        self.base = None
+        self.resources = []
+        self.seen = set()
+
+    def start(self, tag, attrs):
+        if tag == 'base':
+            self.base = self.base or attrs.get('href')
+            return
+        if tag == 'script':
+            kind, src = 'script', attrs.get('src')
+        elif tag == 'img':
+            kind, src = 'image', attrs.get('src')
+        elif 'stylesheet' in (attrs.get('rel') or '').lower().split():
+            kind, src = 'stylesheet', attrs.get('href')
+        else:
+            return
+        src = (src or '').strip()
+        if src and not src.startswith('data:') and src not in self.seen and len(self.resources) < self.max_resources:
+            self.seen.add(src)
+            self.resources.append([kind, src])
+
+    def result(self):
+        return {'resources': self.resources, 'resource_base': self.base}
+
+DEFAULT_FEATURES = [
+    Title, MetaDescription, H1Count, ImageAlt,
+    HeadingOutline, HeadTags, FormLabels, LinkCount, Scripts, Resources
+]
+
+# Single-pass Streaming Parser
+class PageExtractor(HTMLParser):
+    """Feeds HTML chunks through every feature collector without building a tree"""
+
+    def __init__(self, features=None):
+        super().__init__(convert_charrefs=True)
+        self.features = [cls() for cls in (features or DEFAULT_FEATURES)]
+        self.by_tag = {}
+        for feature in self.features:
+            for tag in feature.tags:
+                self.by_tag.setdefault(tag, []).append(feature)
+        self.text_features = [f for f in self.features if f.text]
+
+    def handle_starttag(self, tag, attrs):
+        handlers = self.by_tag.get(tag)
+        if handlers:
+            attrs = dict(attrs)
+            for feature in handlers:
+                feature.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        for feature in self.by_tag.get(tag, ()):
+            feature.end(tag)
+
+    def handle_data(self, data):
+        for feature in self.text_features:
+            feature.data(data)
+
+    def result(self):
+        data = {}
+        for feature in self.features:
+            data.update(feature.result())
+        return data
+
+def extract_from_chunks(chunks, encoding=None, features=None, max_bytes=MAX_PAGE_BYTES, stats=None):
+    """
+    Parses an iterable of byte chunks (stopping at max_bytes) into a feature dict.
+
+    If a `stats` dict is given, the CPU time spent parsing is stored in
+    stats['parse'] so callers can tell it apart from time waiting on the network.
+    """
+    parser = PageExtractor(features)
+    decoder = None
+    total = 0
+    parse_time = 0.0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - total]
+        total += len(chunk)
+        start = time.perf_counter()
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(chunk, encoding))(errors='replace')
+        parser.feed(decoder.decode(chunk))
+        parse_time += time.perf_counter() - start
+        if total >= max_bytes:
+            break
+
+    start = time.perf_counter()
+    if decoder is not None:
+        parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    data = parser.result()
+    if stats is not None:
+        stats['parse'] = parse_time + time.perf_counter() - start
+    data['html_bytes'] = total
+    data['truncated'] = total >= max_bytes
+    return data
+
+def is_html(response):
+    content_type = response.headers.get('Content-Type', 'text/html').lower()
+    return 'html' in content_type
+
+def fetch_page(url, headers=None, features=None, max_bytes=MAX_PAGE_BYTES, timeout=10, html_only=False, stats=None):
+    """
+    Downloads at most max_bytes of a page and extracts its features in one pass.
+
+    Returns (status_code, response_headers, features); features is None when the
+    server answers a conditional request with 304 Not Modified, or when
+    html_only is set and the response is not an HTML document.
+    """
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 or (html_only and not is_html(response)):
+            return response.status_code, response.headers, None
+        return response.status_code, response.headers, extract_from_chunks(
+            response.iter_content(chunk_size=CHUNK_SIZE),
+            encoding=declared_encoding(response),
+            features=features,
+            max_bytes=max_bytes,
+            stats=stats
+        )
+
+def download_page(url, headers=None, max_bytes=MAX_PAGE_BYTES, timeout=10):
+    """
+    Downloads at most max_bytes of a page without parsing it, so the bytes can
+    be handed to another process.
+
+    Returns (status_code, response_headers, body, encoding); body is None on
+    304 Not Modified.
+    """
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304:
+            return response.status_code, response.headers, None, None
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+        return response.status_code, response.headers, bytes(body[:max_bytes]), declared_encoding(response)
+
+def parse_page(body, encoding=None):
+    """Parses a downloaded body; returns (features, parse_seconds). Safe to run in a worker process."""
+    stats = {}
+    data = extract_from_chunks([body], encoding=encoding, stats=stats)
+    return data, stats['parse']
+
+def fetch_features(url, features=None, max_bytes=MAX_PAGE_BYTES, timeout=10):
+    return fetch_page(url, features=features, max_bytes=max_bytes, timeout=timeout)[2]
+
+# Keys every default extraction produces (used to reject cached features from older versions)
+DEFAULT_KEYS = frozenset(extract_from_chunks([]))
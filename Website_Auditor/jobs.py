@@ -0,0 +1,263 @@
+# jobs.py - Durable SQLite job queue + worker (async network/LLM tier, process-pool parse tier)
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from extractor import parse_page
+from metrics import metrics
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.audit_jobs.sqlite3')
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 5.0
+LEASE_SECONDS = 600
+FINISHED = ('done', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    url TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    score INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch);
+"""
+
+SUMMARY_COLUMNS = 'id, batch, url, status, attempts, score, error, created_at, updated_at'
+
+class JobQueue:
+    """
+    Persistent audit queue shared by every process that opens the same file.
+
+    Jobs move queued → running → done, or back to queued with exponential
+    backoff until `max_attempts` is used up and they are marked failed.
+    A running job holds a lease; if its worker dies the lease expires and
+    another worker picks the job up again, so nothing is lost on restart,
+    unless that was its last attempt, in which case it is marked failed.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def submit(self, urls, batch=None, max_attempts=MAX_ATTEMPTS, **options):
+        """Queues one job per URL; returns (batch, job_ids)"""
+        batch = batch or uuid.uuid4().hex[:12]
+        now = time.time()
+        with self.lock:
+            ids = [
+                self.db.execute(
+                    'INSERT INTO jobs (batch, url, options, status, max_attempts, run_after, created_at, updated_at) '
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (batch, url, json.dumps(options), max_attempts, now, now, now)
+                ).lastrowid
+                for url in urls
+            ]
+        return batch, ids
+
+    def claim(self, limit=1):
+        """Atomically leases up to `limit` ready jobs (queued, or running with an expired lease)"""
+        now = time.time()
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                # A lease that ran out on the last attempt means the job kills or hangs its worker
+                self.db.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                    "WHERE status = 'running' AND run_after <= ? AND attempts >= max_attempts",
+                    ('Lease expired on the last attempt (worker died or hung)', now, now)
+                )
+                rows = self.db.execute(
+                    "SELECT id, url, options, attempts FROM jobs "
+                    "WHERE status IN ('queued', 'running') AND run_after <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self.db.executemany(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, run_after = ?, updated_at = ? WHERE id = ?",
+                    [(now + LEASE_SECONDS, now, row['id']) for row in rows]
+                )
+                self.db.execute('COMMIT')
+            except Exception:
+                self.db.execute('ROLLBACK')
+                raise
+        return [
+            {'id': row['id'], 'url': row['url'], 'options': json.loads(row['options']), 'attempt': row['attempts'] + 1}
+            for row in rows
+        ]
+
+    def complete(self, job_id, result):
+        score = result.get('scores', {}).get('overall')
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'done', score = ?, result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (score, json.dumps(result, ensure_ascii=False), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error, retry=True):
+        """Requeues the job with backoff, or marks it failed once its attempts are used up (or `retry` is off)"""
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT attempts, max_attempts FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            retry = retry and row and row['attempts'] < row['max_attempts']
+            self.db.execute(
+                'UPDATE jobs SET status = ?, run_after = ?, error = ?, updated_at = ? WHERE id = ?',
+                ('queued' if retry else 'failed',
+                 now + RETRY_BACKOFF * 2 ** ((row['attempts'] if row else 1) - 1),
+                 error, now, job_id)
+            )
+        return bool(retry)
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def batch_jobs(self, batch, results=False):
+        """Jobs of a batch in submission order; results are only loaded when asked for"""
+        columns = '*' if results else SUMMARY_COLUMNS
+        with self.lock:
+            rows = self.db.execute(f'SELECT {columns} FROM jobs WHERE batch = ? ORDER BY id', (batch,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self, batch=None):
+        query = 'SELECT status, COUNT(*) FROM jobs' + (' WHERE batch = ?' if batch else '') + ' GROUP BY status'
+        with self.lock:
+            return dict(self.db.execute(query, (batch,) if batch else ()).fetchall())
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(row)
+        for key in ('options', 'result'):
+            if job.get(key):
+                job[key] = json.loads(job[key])
+        return job
+
+# Worker (async tier awaits network/LLM work on threads; parsing goes to a process pool)
+class JobWorker:
+    """
+    Pulls jobs from a JobQueue and runs up to `concurrency` audits at once.
+
+    The asyncio loop only schedules: each audit's fetch, probe and model call
+    block a thread from the I/O pool, while the CPU-bound HTML parse is shipped
+    to a pool of `parse_workers` processes (one per core by default). Parsing
+    large pages therefore scales across cores and never stalls the process
+    serving the UI or API.
+    """
+
+    def __init__(self, queue, concurrency=8, parse_workers=None, poll_interval=0.5):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.thread = None
+        self.io_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='audit-io')
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parse_lock = threading.Lock()
+        self.parse_pool = self._new_parse_pool()
+
+    def _new_parse_pool(self):
+        # spawn, not fork: forking a process that already runs threads can deadlock the children
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def parse(self, body, encoding=None):
+        """
+        Parses in the process pool; thread-safe, usable as scrape_website's
+        `parser`. A crashed child breaks the whole executor, so it is replaced
+        and the parse retried once.
+        """
+        pool = self.parse_pool
+        try:
+            return pool.submit(parse_page, body, encoding).result()
+        except BrokenProcessPool:
+            with self.parse_lock:
+                if self.parse_pool is pool:  # not already replaced by another thread
+                    print("[Parse Error] Parse process died; restarting the pool")
+                    metrics.inc('audit_errors_total', stage='parse_pool')
+                    self.parse_pool = self._new_parse_pool()
+                    pool.shutdown(wait=False, cancel_futures=True)
+            return self.parse_pool.submit(parse_page, body, encoding).result()
+
+    async def execute(self, job):
+        from auditor import audit_url, PermanentAuditError  # deferred so importing jobs stays light in parse processes
+        loop = asyncio.get_running_loop()
+        audit = partial(audit_url, job['url'], mode='job', parser=self.parse, **job['options'])
+        try:
+            result = await loop.run_in_executor(self.io_pool, audit)
+        except Exception as e:
+            retried = self.queue.fail(job['id'], str(e), retry=not isinstance(e, PermanentAuditError))
+            metrics.inc('audit_jobs_total', result='retried' if retried else 'failed')
+            print(f"[Job Error] #{job['id']} {job['url']} (attempt {job['attempt']}): {e}")
+            return
+        self.queue.complete(job['id'], result)
+        metrics.inc('audit_jobs_total', result='done')
+
+    async def run(self):
+        running = set()
+        while not self.stopping.is_set():
+            free = self.concurrency - len(running)
+            for job in self.queue.claim(free) if free > 0 else []:
+                running.add(asyncio.create_task(self.execute(job)))
+            if running:
+                _, running = await asyncio.wait(running, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(self.poll_interval)
+        if running:
+            await asyncio.wait(running)
+
+    def start(self):
+        """Runs the worker loop in a background thread"""
+        self.thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True, name='audit-jobs')
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        self.io_pool.shutdown(wait=False)
+        self.parse_pool.shutdown(wait=False, cancel_futures=True)
+
+# Shared queue + in-process worker (configured via environment)
+_queue = None
+_worker = None
+_lock = threading.Lock()
+
+def get_queue():
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = JobQueue(os.getenv('AUDIT_JOBS_PATH', DEFAULT_PATH))
+        return _queue
+
+def get_worker():
+    """Starts the shared worker on first use (AUDIT_WORKERS audits at once, AUDIT_PARSE_WORKERS processes)"""
+    global _worker
+    queue = get_queue()
+    with _lock:
+        if _worker is None:
+            _worker = JobWorker(
+                queue,
+                concurrency=int(os.getenv('AUDIT_WORKERS', '8')),
+                parse_workers=int(os.getenv('AUDIT_PARSE_WORKERS', '0')) or None
+            ).start()
+        return _worker
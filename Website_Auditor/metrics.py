@@ -0,0 +1,127 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1024, 10240, 102400, 512000, 1048576, 2097152, 5242880)
+
+DESCRIPTIONS = {
+    'audit_stage_seconds': ('histogram', "Time spent in each audit stage", SECONDS_BUCKETS),
+    'audit_llm_first_token_seconds': ('histogram', "Time from request to first streamed model token", SECONDS_BUCKETS),
+    'audit_response_bytes': ('histogram', "HTML bytes read per fetched page", BYTES_BUCKETS),
+    'audit_cache_total': ('counter', "Page and analysis cache lookups by result", None),
+    'audit_errors_total': ('counter', "Errors by audit stage", None),
+    'audits_total': ('counter', "Completed audits by mode and result", None),
+    'audit_jobs_total': ('counter', "Queued audit jobs finished, retried or failed", None),
+}
+
+# Metrics Registry (Prometheus text exposition, no external dependency)
+class Metrics:
+    """
+    Thread-safe counters and histograms keyed by (name, labels).
+
+    Recording is one lock acquisition plus a dict update and a bisect, so it
+    is cheap enough to leave on for every audit.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = DESCRIPTIONS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            hist[0][bisect_left(buckets, value)] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def render(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}' if pairs else ''
+
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self.histograms.items()}
+
+        lines = []
+        for name, (kind, help_text, buckets) in DESCRIPTIONS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{fmt(labels)} {value}")
+                continue
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{fmt(labels)} {total}")
+                lines.append(f"{name}_count{fmt(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+def record_stage(stage, seconds, timings=None):
+    """Records a stage duration, optionally adding it to a per-audit timings dict"""
+    metrics.observe('audit_stage_seconds', seconds, stage=stage)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def timed(stage, timings=None):
+    """Times the wrapped block as `stage`, counting an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.inc('audit_errors_total', stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, timings)
+
+# /metrics endpoint
+def send_metrics(handler):
+    """Writes the Prometheus exposition as the response of any BaseHTTPRequestHandler"""
+    body = metrics.render().encode('utf-8')
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        send_metrics(self)
+
+    def log_message(self, *args):
+        pass
+
+def serve_metrics(port, host='127.0.0.1'):
+    """Serves /metrics on a background thread; returns None (and logs) if the port is taken"""
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"[Metrics Error] Cannot serve metrics on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,29 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "AI-Website-Auditor/1.0 (+https://github.com/divcreates/Projects)"
+DEFAULT_POOL_SIZE = 10
+MAX_HOSTS = 100
+
+_session = None
+_pool_size = 0
+_lock = threading.Lock()
+
+# Shared HTTP Session (keep-alive connections pooled per host)
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """Returns the process-wide requests.Session, growing its per-host pool if needed"""
+    global _session, _pool_size
+    if _session is not None and pool_size <= _pool_size:
+        return _session
+
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers['User-Agent'] = USER_AGENT
+        if pool_size > _pool_size:
+            adapter = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=pool_size)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _pool_size = pool_size
+    return _session
@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse
+from net import get_session
+
+MAX_WORKERS = 16
+ASSET_TIMEOUT = (3.05, 5)
+PROBE_BUDGET = 8.0
+COMPRESSIBLE = ('javascript', 'css', 'svg', 'json', 'text/')
+SLOWEST_LIMIT = 5
+
+def content_size(response):
+    # A ranged GET answers "bytes 0-0/12345"; HEAD and plain GETs send Content-Length
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and not content_range.endswith('*'):
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+def is_cacheable(headers):
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return False
+    return 'max-age' in cache_control or 'immutable' in cache_control or 'Expires' in headers
+
+# Single Asset Probe (HEAD first, ranged GET when HEAD is refused)
+def probe_asset(kind, url):
+    session = get_session()
+    start = time.perf_counter()
+    response = session.head(url, timeout=ASSET_TIMEOUT, allow_redirects=True)
+    if response.status_code in (403, 405, 501) or content_size(response) is None:
+        response = session.get(url, headers={'Range': 'bytes=0-0'}, timeout=ASSET_TIMEOUT, stream=True)
+        response.close()
+
+    content_type = response.headers.get('Content-Type', '').lower()
+    return {
+        'kind': kind,
+        'url': url,
+        'status': response.status_code,
+        'bytes': content_size(response),
+        'ttfb': round(response.elapsed.total_seconds(), 3),
+        'total_time': round(time.perf_counter() - start, 3),
+        'compressed': bool(response.headers.get('Content-Encoding')),
+        'compressible': any(t in content_type for t in COMPRESSIBLE),
+        'cacheable': is_cacheable(response.headers),
+    }
+
+# Concurrent Sub-resource Probe
+def probe_resources(page_url, resources, base=None, max_workers=MAX_WORKERS, budget=PROBE_BUDGET):
+    """
+    Probes every script, stylesheet and image of a page concurrently and
+    summarises transfer size, compression, caching and TTFB.
+
+    Probes still running when `budget` seconds have passed are abandoned and
+    counted as timed out; they never fail the audit.
+    """
+    base = urljoin(page_url, base) if base else page_url
+    page_host = urlparse(page_url).netloc
+    assets = []
+    for kind, src in resources:
+        url = urljoin(base, src)
+        if urlparse(url).scheme in ('http', 'https'):
+            assets.append((kind, url))
+
+    get_session(pool_size=max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(probe_asset, kind, url): (kind, url) for kind, url in assets}
+    done, not_done = wait(futures, timeout=budget)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    failed = 0
+    for future in done:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            failed += 1
+            print(f"[Probe Error] {futures[future][1]}: {e}")
+
+    ok = [r for r in results if r['status'] < 400]
+    sized = [r for r in ok if r['bytes'] is not None]
+    ttfbs = sorted(r['ttfb'] for r in ok)
+    by_kind = {}
+    for r in sized:
+        by_kind[r['kind']] = by_kind.get(r['kind'], 0) + r['bytes']
+
+    return {
+        'assets': len(assets),
+        'probed': len(ok),
+        'failed': failed + len(results) - len(ok),
+        'timed_out': len(not_done),
+        'third_party': sum(1 for _, url in assets if urlparse(url).netloc != page_host),
+        'total_bytes': sum(r['bytes'] for r in sized),
+        'unknown_size': len(ok) - len(sized),
+        'bytes_by_kind': by_kind,
+        'uncompressed_text': sum(1 for r in ok if r['compressible'] and not r['compressed']),
+        'uncached': sum(1 for r in ok if not r['cacheable']),
+        'median_ttfb': ttfbs[len(ttfbs) // 2] if ttfbs else None,
+        'p95_ttfb': ttfbs[min(len(ttfbs) - 1, int(len(ttfbs) * 0.95))] if ttfbs else None,
+        'slowest': [
+            {'url': r['url'], 'ttfb': r['ttfb']}
+            for r in sorted(ok, key=lambda r: r['ttfb'], reverse=True)[:SLOWEST_LIMIT]
+        ],
+    }
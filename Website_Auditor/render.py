@@ -0,0 +1,100 @@
+import re
+from html import escape
+
+BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+
+# Styled section headers
+HEADERS = [
+    ('OVERALL SCORE:', '<h2 style="color: #4CAF50;">🎯 OVERALL SCORE:</h2>'),
+    ('CATEGORY SCORES:', '<h3 style="color: #2196F3;">📊 CATEGORY SCORES:</h3>'),
+    ('KEY FINDINGS:', '<h3 style="color: #FF9800;">🔍 KEY FINDINGS:</h3>'),
+    ('TOP RECOMMENDATIONS:', '<h3 style="color: #9C27B0;">💡 TOP RECOMMENDATIONS:</h3>'),
+]
+
+WRAPPER = '''
+<div style="font-family: Arial, sans-serif; line-height: 1.6; padding: 20px; background: #121212; color: #F5F5F5; border-radius: 10px;">
+    {}
+</div>
+'''
+
+def render_line(line):
+    line = escape(line, quote=False)
+    line = BOLD_RE.sub(r'<strong>\1</strong>', line)
+    for marker, html in HEADERS:
+        if marker in line:
+            line = line.replace(marker, html)
+    return line
+
+class IncrementalRenderer:
+    """
+    Renders a streamed report to HTML as chunks arrive.
+
+    Completed lines are converted once and kept; only the trailing partial
+    line is re-rendered on each feed, so a chunk costs work proportional to
+    its own size rather than to the whole report.
+    """
+
+    def __init__(self):
+        self.rendered = []
+        self.pending = ''
+
+    def feed(self, chunk):
+        text = self.pending + chunk
+        lines = text.split('\n')
+        self.pending = lines.pop()
+        for line in lines:
+            self.rendered.append(render_line(line) + '<br>')
+        return self.html()
+
+    def html(self):
+        return WRAPPER.format(''.join(self.rendered) + render_line(self.pending))
+
+# Format output as HTML
+def format_analysis(analysis):
+    if not analysis:
+        return "No analysis available."
+    return IncrementalRenderer().feed(analysis)
+
+# Per-audit timing breakdown
+STAGE_ORDER = ('fetch', 'parse', 'probe', 'score', 'llm', 'render')
+
+def format_timings(timings):
+    total = sum(timings.values()) or 1.0
+    rows = ''.join(
+        f"<tr><td>{stage}</td><td>{timings[stage] * 1000:.0f} ms</td><td>{100 * timings[stage] / total:.0f}%</td></tr>"
+        for stage in STAGE_ORDER if stage in timings
+    )
+    return (
+        '<div style="font-family: Arial, sans-serif; padding: 10px 20px; color: #8b949e;">'
+        f'<h4>⏱️ TIMING BREAKDOWN</h4><table>{rows}</table></div>'
+    )
+
+# Site crawl report
+SITE_ROWS = [
+    ('Pages crawled', 'pages_crawled', ''),
+    ('Pages failed', 'pages_failed', ''),
+    ('Pages skipped (robots.txt / non-HTML)', 'pages_skipped', ''),
+    ('Missing title', 'missing_title_pct', '%'),
+    ('Missing meta description', 'missing_description_pct', '%'),
+    ('No <h1>', 'no_h1_pct', '%'),
+    ('Multiple <h1>', 'multiple_h1_pct', '%'),
+    ('Pages sharing a duplicate title', 'duplicate_title_pages', ''),
+    ('Images without alt (total)', 'total_img_without_alt', ''),
+]
+
+def format_site_report(summary, finished=False):
+    status = '✅ Crawl complete' if finished else '🕷️ Crawling'
+    rows = ''.join(
+        f"<tr><td>{escape(label)}</td><td>{summary[key]}{unit}</td></tr>"
+        for label, key, unit in SITE_ROWS
+    )
+    examples = ''.join(
+        f"<h4>{escape(issue)}</h4><ul>{''.join(f'<li>{escape(url)}</li>' for url in urls)}</ul>"
+        for issue, urls in summary['examples'].items()
+    )
+    return WRAPPER.format(
+        f'<h2 style="color: #4CAF50;">{status}: {escape(summary["start_url"])}</h2>'
+        f'<p>{summary["pages_crawled"]} pages in {summary["elapsed"]}s</p>'
+        f'<h3 style="color: #2196F3;">📊 SITE SUMMARY:</h3><table style="width: 100%;">{rows}</table>'
+        f'<h3 style="color: #FF9800;">🔍 EXAMPLE PAGES:</h3>{examples}'
+    )
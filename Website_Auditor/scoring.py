@@ -0,0 +1,134 @@
+CATEGORY_WEIGHTS = {'SEO': 0.4, 'Accessibility': 0.35, 'Performance': 0.25}
+
+KB = 1024
+
+def between(value, low, high):
+    return 1.0 if low <= value <= high else 0.0
+
+def falloff(value, good, bad):
+    """1.0 at or below `good`, 0.0 at or above `bad`, linear in between"""
+    if value <= good:
+        return 1.0
+    if value >= bad:
+        return 0.0
+    return (bad - value) / (bad - good)
+
+def ratio_ok(bad, total):
+    return 1.0 - bad / total if total else 1.0
+
+def probed(check):
+    """Wraps a rule that needs sub-resource probe data; skipped when the page was not probed"""
+    return lambda d: check(d['probe']) if d.get('probe') and d['probe']['probed'] else None
+
+def zoom_allowed(viewport):
+    settings = dict(
+        part.split('=', 1) for part in (viewport or '').replace(' ', '').lower().split(',') if '=' in part
+    )
+    if settings.get('user-scalable') in ('no', '0'):
+        return 0.0
+    try:
+        return 0.0 if float(settings.get('maximum-scale', 5)) < 2 else 1.0
+    except ValueError:
+        return 1.0
+
+# Scoring Rules
+#
+# (category, weight, check, finding, recommendation). `check` maps the feature
+# dict to a 0..1 pass ratio (or None when the rule does not apply); failed rules
+# surface as findings ordered by how many points they cost.
+RULES = [
+    ('SEO', 3, lambda d: 0.0 if d['title'] == 'No title' else 1.0,
+     "Page has no <title>", "Add a descriptive, unique <title> to the page"),
+    ('SEO', 2, lambda d: d['title'] == 'No title' or between(len(d['title']), 10, 60),
+     "Title length is outside 10-60 characters", "Keep the title between 10 and 60 characters"),
+    ('SEO', 3, lambda d: 0.0 if d['description'] == 'No description' else 1.0,
+     "Meta description is missing", "Add a meta description summarising the page"),
+    ('SEO', 2, lambda d: d['description'] == 'No description' or between(len(d['description']), 50, 160),
+     "Meta description length is outside 50-160 characters", "Keep the meta description between 50 and 160 characters"),
+    ('SEO', 2, lambda d: 1.0 if d['h1_count'] == 1 else 0.0,
+     "Page does not have exactly one <h1>", "Use a single <h1> that states the page topic"),
+    ('SEO', 1, lambda d: 1.0 if d['canonical'] else 0.0,
+     "No canonical link", "Add <link rel=\"canonical\"> to avoid duplicate-content issues"),
+    ('SEO', 1, lambda d: len({'og:title', 'og:description', 'og:image'} & set(d['og_tags'])) / 3,
+     "Open Graph tags are incomplete", "Add og:title, og:description and og:image for link previews"),
+    ('SEO', 3, lambda d: 0.0 if d['noindex'] else 1.0,
+     "Page is marked noindex", "Remove the robots noindex directive if the page should rank"),
+    ('SEO', 1, lambda d: 1.0 if d['viewport'] is not None else 0.0,
+     "No viewport meta tag (not mobile friendly)", "Add <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"),
+
+    ('Accessibility', 3, lambda d: 1.0 if d['lang'] else 0.0,
+     "<html> has no lang attribute", "Declare the page language with <html lang=\"...\">"),
+    ('Accessibility', 3, lambda d: ratio_ok(d['img_without_alt'], d['img_count']),
+     "Images are missing alt text", "Give every meaningful image descriptive alt text"),
+    ('Accessibility', 3, lambda d: ratio_ok(d['unlabelled_controls'], d['form_controls']),
+     "Form controls have no label", "Associate each form control with a <label> or aria-label"),
+    ('Accessibility', 2, lambda d: 0.0 if d['heading_skips'] else 1.0,
+     "Heading levels are skipped", "Keep headings in order (h1 → h2 → h3) without skipping levels"),
+    ('Accessibility', 1, lambda d: ratio_ok(d['empty_links'], d['link_count']),
+     "Links without a real destination", "Replace href=\"#\"/javascript: links with buttons or real URLs"),
+    ('Accessibility', 1, lambda d: zoom_allowed(d['viewport']),
+     "Viewport disables zooming", "Allow pinch-zoom (drop user-scalable=no / maximum-scale=1)"),
+
+    ('Performance', 3, lambda d: falloff(d['html_bytes'], 100 * KB, 1024 * KB),
+     "HTML document is heavy", "Reduce HTML size (trim markup, paginate long lists)"),
+    ('Performance', 2, lambda d: falloff(d['inline_script_bytes'], 20 * KB, 200 * KB),
+     "Large inline scripts", "Move inline JavaScript into cached external files"),
+    ('Performance', 1, lambda d: falloff(d['inline_style_bytes'], 20 * KB, 200 * KB),
+     "Large inline styles", "Move inline CSS into a cached stylesheet"),
+    ('Performance', 2, lambda d: falloff(d['external_scripts'], 10, 40),
+     "Many external scripts", "Bundle or defer external scripts"),
+    ('Performance', 1, lambda d: falloff(d['stylesheet_count'], 4, 15),
+     "Many stylesheets", "Combine stylesheets to cut render-blocking requests"),
+    ('Performance', 1, lambda d: falloff(d['img_count'], 40, 150),
+     "Many images on one page", "Lazy-load below-the-fold images"),
+    ('Performance', 3, probed(lambda p: falloff(p['total_bytes'], 1024 * KB, 5 * 1024 * KB)),
+     "Total page weight is high", "Compress images and trim unused JavaScript/CSS"),
+    ('Performance', 2, probed(lambda p: ratio_ok(p['uncompressed_text'], p['probed'])),
+     "Text assets served without compression", "Enable gzip or brotli for scripts, stylesheets and SVG"),
+    ('Performance', 1, probed(lambda p: ratio_ok(p['uncached'], p['probed'])),
+     "Assets without cache headers", "Serve static assets with a long Cache-Control max-age"),
+    ('Performance', 2, probed(lambda p: falloff(p['median_ttfb'], 0.2, 1.0)),
+     "Slow asset response times (TTFB)", "Serve assets from a CDN close to users"),
+]
+
+# Scoring Engine
+def score_page(data):
+    """
+    Computes deterministic 0-100 scores per category (and overall) from the
+    extracted feature dict, plus the failed rules ordered by points lost.
+    """
+    earned = {category: 0.0 for category in CATEGORY_WEIGHTS}
+    possible = {category: 0.0 for category in CATEGORY_WEIGHTS}
+    findings = []
+
+    for category, weight, check, finding, recommendation in RULES:
+        passed = check(data)
+        if passed is None:
+            continue
+        passed = float(passed)
+        earned[category] += weight * passed
+        possible[category] += weight
+        if passed < 1.0:
+            findings.append({
+                'category': category,
+                'finding': finding,
+                'recommendation': recommendation,
+                'impact': weight * (1.0 - passed)
+            })
+
+    categories = {c: round(100 * earned[c] / possible[c]) for c in CATEGORY_WEIGHTS}
+    overall = round(sum(categories[c] * w for c, w in CATEGORY_WEIGHTS.items()))
+    findings.sort(key=lambda f: f['impact'], reverse=True)
+    return {'overall': overall, 'categories': categories, 'findings': findings}
+
+# Report without the LLM (same layout as the GPT-4o report)
+def format_scores(scores):
+    lines = [f"OVERALL SCORE: {scores['overall']}/100", "", "CATEGORY SCORES:"]
+    lines += [f"• {category}: {score}/100" for category, score in scores['categories'].items()]
+    lines += ["", "KEY FINDINGS:"]
+    findings = scores['findings']
+    lines += [f"• [{f['category']}] {f['finding']}" for f in findings[:3]] or ["• No issues detected"]
+    lines += ["", "TOP RECOMMENDATIONS:"]
+    for icon, label, finding in zip(('🔴', '🟡', '🔵'), ('HIGH', 'MEDIUM', 'LOW'), findings[:3]):
+        lines.append(f"{icon} {label} PRIORITY: {finding['recommendation']}")
+    return '\n'.join(lines)
@@ -1,5 +1,6 @@
 from .data_extractor import create_data_extractor
 from .summarizer import create_summarizer
 from .page_formatter import create_page_formatter
+from .pool import agent_pool
 
-__all__ = ['create_data_extractor', 'create_summarizer', 'create_page_formatter']
+__all__ = ['create_data_extractor', 'create_summarizer', 'create_page_formatter', 'agent_pool']
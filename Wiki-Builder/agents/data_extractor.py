@@ -1,21 +1,16 @@
 from crewai import Agent
-from crewai_tools import WebsiteSearchTool
-from langchain_openai import ChatOpenAI
-import os
+from .search_tool import IndexedWebsiteSearchTool
+from .llm import get_llm
 import time
 
 def create_data_extractor():
     """Creates the Data Extractor agent to fetch facts from the web (max 3-4 searches)"""
 
-    # Use CrewAI’s built-in WebsiteSearchTool
-    search_tool = WebsiteSearchTool()
+    # Website search over the persistent retrieval index (pages and embeddings reused across topics)
+    search_tool = IndexedWebsiteSearchTool()
 
-    # Initialize LLM
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.3,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    # Shared LLM client (created once per process)
+    llm = get_llm(0.3)
 
     backstory = (
         "You are a Data Extractor. "
@@ -0,0 +1,60 @@
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from crewai import BaseLLM
+from gateway import get_gateway
+
+MODEL = "gpt-4o"
+CONTEXT_WINDOW = 128000
+
+class GatewayLLM(BaseLLM):
+    """
+    CrewAI LLM that sends every call through the shared LLM gateway: one
+    pooled client, one rate limit and one response cache for all agents,
+    with identical in-flight prompts sent once. With stream=True the text is
+    published chunk by chunk on CrewAI's event bus (see crew.streaming_to).
+    """
+
+    def __init__(self, model, temperature, stream=False):
+        super().__init__(model=model, temperature=temperature)
+        self.stream = stream
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        params = {"temperature": self.temperature}
+        if self.stop:
+            params["stop"] = self.stop[:4]  # the API accepts at most 4
+        start = time.time()
+        if self.stream:
+            response = self._stream(messages, params)
+        else:
+            response = get_gateway().chat(messages, model=self.model, **params)
+
+        # CrewAI counts each agent's tokens through its callbacks (crew usage and traces read them)
+        usage = SimpleNamespace(**response["usage"], prompt_tokens_details=None)
+        for callback in callbacks or []:
+            if hasattr(callback, "log_success_event"):
+                callback.log_success_event({}, {"usage": usage}, start, time.time())
+        return response["content"]
+
+    def _stream(self, messages, params):
+        from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        chunks = get_gateway().stream(messages, model=self.model, **params)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as done:
+                return done.value
+            crewai_event_bus.emit(self, LLMStreamChunkEvent(chunk=chunk))
+
+    def supports_function_calling(self):
+        return False  # tools are used through CrewAI's ReAct text format
+
+    def get_context_window_size(self):
+        return int(CONTEXT_WINDOW * 0.75)
+
+@lru_cache(maxsize=None)
+def get_llm(temperature, stream=False):
+    """One GPT-4o LLM per (temperature, stream) per process; safe to share between agents and threads"""
+    return GatewayLLM(MODEL, temperature, stream=stream)
@@ -1,9 +1,8 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-import os
+from .llm import get_llm
 
-def create_page_formatter():
-    """Creates the Page Formatter agent to generate final Wikipedia-style articles"""
+def create_page_formatter(stream=False):
+    """Creates the Page Formatter agent to generate final Wikipedia-style articles (stream=True streams its tokens)"""
 
     backstory = (
         "You are a Wikipedia article formatting expert. "
@@ -37,11 +36,8 @@ def create_page_formatter():
         "- Each section must be well-written, fact-rich, and structured."
     )
 
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.5,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    # Shared LLM client (created once per process)
+    llm = get_llm(0.5, stream=stream)
 
     return Agent(
         role="Page Formatter",
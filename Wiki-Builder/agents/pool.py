@@ -0,0 +1,59 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class AgentPool:
+    """
+    Keeps built agents warm between requests.
+
+    Each request checks an agent out for its own exclusive use and returns
+    it afterwards, so concurrent articles (or parallel section writers)
+    never share one agent's in-flight state; the pool simply grows to the
+    peak concurrency. Per-request state is cleared on return.
+    """
+
+    def __init__(self):
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.build_seconds = 0.0
+
+    @contextmanager
+    def checkout(self, factory, **kwargs):
+        key = (factory, tuple(sorted(kwargs.items())))
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            agent = idle.pop() if idle else None
+            self.reused += agent is not None
+        if agent is None:
+            start = time.perf_counter()
+            agent = factory(**kwargs)
+            with self.lock:
+                self.created += 1
+                self.build_seconds += time.perf_counter() - start
+        try:
+            yield agent
+        finally:
+            reset_agent(agent)
+            with self.lock:
+                self.idle[key].append(agent)
+
+    def warm(self, factory, **kwargs):
+        """Builds one idle agent ahead of the first request"""
+        with self.checkout(factory, **kwargs):
+            pass
+
+def reset_agent(agent):
+    # Tool results and tool usage counters accumulate on the agent between tasks
+    if getattr(agent, 'tools_results', None):
+        agent.tools_results = []
+    for tool in getattr(agent, 'tools', None) or []:
+        if hasattr(tool, 'current_usage_count'):
+            tool.current_usage_count = 0
+    # Token counts too, so usage (and traces) cover one request rather than the agent's lifetime
+    token_process = getattr(agent, '_token_process', None)
+    if token_process is not None:
+        agent._token_process = type(token_process)()
+
+agent_pool = AgentPool()
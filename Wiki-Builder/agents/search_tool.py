@@ -0,0 +1,40 @@
+import time
+from typing import Optional, Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from retrieval import get_index
+from tracing import record_tool
+
+class WebsiteSearchInput(BaseModel):
+    search_query: str = Field(..., description="What to look for")
+    website: Optional[str] = Field(None, description="Full URL of the page to search; omit to search every page indexed so far")
+
+class IndexedWebsiteSearchTool(BaseTool):
+    """Drop-in for WebsiteSearchTool backed by the persistent, deduplicated retrieval index"""
+
+    name: str = "Search in a specific website"
+    description: str = (
+        "Semantic search over a web page's content. Give a search_query and the website URL to search; "
+        "pages already fetched for earlier research are reused without fetching or embedding them again."
+    )
+    args_schema: Type[BaseModel] = WebsiteSearchInput
+
+    def _run(self, search_query: str, website: Optional[str] = None) -> str:
+        start = time.perf_counter()
+        try:
+            return self._search(search_query, website)
+        finally:
+            record_tool(self.name, time.perf_counter() - start)
+
+    def _search(self, search_query, website):
+        index = get_index()
+        if website:
+            try:
+                index.add_page(website)
+            except Exception as e:
+                print(f"[Search Error] {website}: {e}")
+                return f"Could not fetch {website}: {e}"
+        results = index.search(search_query, url=website)
+        if not results:
+            return "No relevant content found."
+        return "\n\n".join(f"[{score:.2f}] {text}" for text, score in results)
@@ -1,16 +1,11 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-import os
+from .llm import get_llm
 
 def create_summarizer():
     """Creates the Summarizer agent to organize and structure data for Wikipedia-style content"""
 
-    # Initialize LLM
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.5,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    # Shared LLM client (created once per process)
+    llm = get_llm(0.5)
 
     return Agent(
         role="Summarizer",
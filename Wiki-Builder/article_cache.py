@@ -0,0 +1,160 @@
+# article_cache.py - Persistent topic-keyed article store (SQLite, TTL + LRU eviction)
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.wiki_cache.sqlite3')
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+SUMMARY_TTL = 7 * 24 * 3600
+EVICT_EVERY = 20
+ERROR_PREFIX = "Error in multi-agent crew execution"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    topic_key TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    sections TEXT NOT NULL,
+    image_url TEXT,
+    metadata TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed_at);
+CREATE TABLE IF NOT EXISTS summaries (
+    topic_key TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed_at);
+"""
+
+def normalize_topic(topic):
+    """
+    '  Ancient   ROME! ' and 'ancient rome' share one cache entry. Only case,
+    whitespace and surrounding sentence punctuation are ignored, so 'C',
+    'C++' and 'C#' (or 'Node.js') stay distinct topics.
+    """
+    return ' '.join(topic.casefold().split()).strip(' .,;:!?"\'')
+
+class ArticleCache:
+    """
+    Stores finished articles by normalized topic: the raw markdown, the parsed
+    sections, the lead image URL and generation metadata (time taken, word
+    count, when it was generated). Entries expire after `ttl` seconds and at
+    most `max_entries` are kept, dropping the least recently viewed first.
+
+    Wikipedia summaries (extract + thumbnail, or a "no page" marker) live in
+    a second table with a shorter SUMMARY_TTL and the same size limit.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def get(self, topic):
+        key = normalize_topic(topic)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                'SELECT topic, markdown, sections, image_url, metadata, created_at FROM articles '
+                'WHERE topic_key = ? AND created_at > ?',
+                (key, now - self.ttl)
+            ).fetchone()
+            if row:
+                self.db.execute('UPDATE articles SET accessed_at = ? WHERE topic_key = ?', (now, key))
+        if not row:
+            return None
+        return {
+            'topic': row[0],
+            'markdown': row[1],
+            'sections': json.loads(row[2]),
+            'image_url': row[3],
+            'metadata': json.loads(row[4]),
+            'created_at': row[5],
+        }
+
+    def put(self, topic, markdown, sections, image_url=None, metadata=None):
+        """Stores an article; failed crew runs are never cached"""
+        if not markdown or markdown.startswith(ERROR_PREFIX):
+            return False
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (normalize_topic(topic), topic, markdown, json.dumps(sections), image_url,
+                 json.dumps(metadata or {}), now, now)
+            )
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(now)
+        return True
+
+    def get_summary(self, topic):
+        key = normalize_topic(topic)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                'SELECT summary FROM summaries WHERE topic_key = ? AND created_at > ?',
+                (key, now - SUMMARY_TTL)
+            ).fetchone()
+            if row:
+                self.db.execute('UPDATE summaries SET accessed_at = ? WHERE topic_key = ?', (now, key))
+        return json.loads(row[0]) if row else None
+
+    def put_summary(self, topic, summary):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)',
+                (normalize_topic(topic), json.dumps(summary), now, now)
+            )
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def delete(self, topic):
+        with self.lock:
+            self.db.execute('DELETE FROM articles WHERE topic_key = ?', (normalize_topic(topic),))
+
+    def _evict(self, now):
+        self.db.execute('DELETE FROM articles WHERE created_at <= ?', (now - self.ttl,))
+        self.db.execute('DELETE FROM summaries WHERE created_at <= ?', (now - SUMMARY_TTL,))
+        for table in ('articles', 'summaries'):
+            self.db.execute(
+                f'DELETE FROM {table} WHERE topic_key NOT IN '
+                f'(SELECT topic_key FROM {table} ORDER BY accessed_at DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM articles')
+            self.db.execute('DELETE FROM summaries')
+
+# Shared store (configured via environment; WIKI_CACHE=0 disables it)
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_article_cache():
+    global _cache
+    if os.getenv('WIKI_CACHE', '1') == '0':
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArticleCache(
+                path=os.getenv('WIKI_CACHE_PATH', DEFAULT_PATH),
+                ttl=float(os.getenv('WIKI_CACHE_TTL', DEFAULT_TTL)),
+                max_entries=int(os.getenv('WIKI_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+            )
+        return _cache
@@ -0,0 +1,179 @@
+# batch.py - Pre-generate many articles: bounded concurrency, shared token budget, resumable output
+#
+#   python batch.py topics.txt --output articles.jsonl --concurrency 8 --tpm 400000
+#   python batch.py topics.txt --output articles/        # one .md + .json per topic
+#
+# Finished topics are skipped on restart, so an interrupted run just resumes.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from dotenv import load_dotenv
+from article_cache import get_article_cache, normalize_topic, ERROR_PREFIX
+from sections import index_sections, slugify
+from wiki_summary import fetch_summary_async
+from gateway import get_gateway
+
+load_dotenv()
+
+class ArticleWriter:
+    def __init__(self, path):
+        self.path = path
+        self.to_dir = path.endswith(('/', os.sep)) or os.path.isdir(path)
+        self.lock = threading.Lock()
+        if self.to_dir:
+            os.makedirs(path, exist_ok=True)
+
+    def finished_topics(self):
+        """Normalized topics already written successfully (for resuming)"""
+        done = set()
+        if self.to_dir:
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    with open(os.path.join(self.path, name), encoding='utf-8') as f:
+                        record = json.load(f)
+                    if record.get('ok'):
+                        done.add(normalize_topic(record['topic']))
+        elif os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if record.get('ok'):
+                        done.add(normalize_topic(record['topic']))
+        return done
+
+    @staticmethod
+    def file_stem(topic):
+        """Readable slug plus a short hash of the normalized topic, so 'C++' and 'C#' never share a file"""
+        digest = hashlib.sha256(normalize_topic(topic).encode('utf-8')).hexdigest()[:8]
+        return f"{slugify(topic)[:60]}-{digest}"
+
+    def write(self, record):
+        with self.lock:
+            if not self.to_dir:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                return
+            base = os.path.join(self.path, self.file_stem(record['topic']))
+            if record['ok']:
+                with open(base + '.md', 'w', encoding='utf-8') as f:
+                    f.write(record['markdown'])
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump({k: v for k, v in record.items() if k != 'markdown'}, f, ensure_ascii=False, indent=2)
+
+def load_topics(text):
+    """One topic per line; blank lines and # comments skipped, duplicates dropped"""
+    seen = set()
+    topics = []
+    for line in text.splitlines():
+        topic = line.strip()
+        if not topic or topic.startswith('#') or normalize_topic(topic) in seen:
+            continue
+        seen.add(normalize_topic(topic))
+        topics.append(topic)
+    return topics
+
+# Single Topic (rate-limit backoff and retries happen per model call in the LLM gateway)
+def generate(topic, parallel_sections, use_cache):
+    from crew import run_crew
+
+    start = time.perf_counter()
+    summary = fetch_summary_async(topic)
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    usage_lock = threading.Lock()
+    trace = {}
+
+    def on_event(kind, value):
+        if kind == 'trace':
+            trace.update(value)
+        elif kind == 'usage':
+            with usage_lock:
+                for key in usage:
+                    usage[key] += value.get(key, 0)
+
+    raw = run_crew(topic, parallel_sections=parallel_sections, on_event=on_event, seed=summary)
+    failed = raw.startswith(ERROR_PREFIX)
+
+    record = {
+        'topic': topic,
+        'ok': not failed,
+        'error': raw if failed else None,
+        'elapsed': round(time.perf_counter() - start, 2),
+        'usage': usage,
+        'trace': trace or None,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    if not failed:
+        sections = index_sections(raw)
+        try:
+            image_url = (summary.result(timeout=5) or {}).get('image_url')
+        except Exception:
+            image_url = None
+        record.update(markdown=raw, sections=sections, image_url=image_url)
+        cache = get_article_cache() if use_cache else None
+        if cache:
+            cache.put(topic, raw, sections, image_url, {
+                'generated_time': record['elapsed'],
+                'word_count': len(raw.split()),
+                'generated_at': record['generated_at'],
+                'mode': 'parallel' if parallel_sections else 'sequential',
+                'trace': record['trace'],
+            })
+    return record
+
+def run_batch(topics, output, concurrency=4, tokens_per_minute=0, parallel_sections=False, use_cache=True):
+    writer = ArticleWriter(output)
+    done = writer.finished_topics()
+    pending = [t for t in topics if normalize_topic(t) not in done]
+    print(f"📚 {len(topics)} topics, {len(topics) - len(pending)} already done, {len(pending)} to generate", file=sys.stderr)
+
+    # Every model call already waits on the gateway's limiter; --tpm sets its tokens-per-minute budget
+    if tokens_per_minute:
+        get_gateway().limiter.tokens_per_minute = tokens_per_minute
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(generate, t, parallel_sections, use_cache): t for t in pending}
+        for finished, future in enumerate(as_completed(futures), 1):
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {'topic': futures[future], 'ok': False, 'error': str(e), 'elapsed': None}
+            failed += not record['ok']
+            writer.write(record)
+            status = f"✅ {record['usage']['total_tokens']} tokens" if record['ok'] else f"❌ {record['error']}"
+            print(f"[{finished}/{len(pending)}] {record['topic']} {status} ({record['elapsed']}s)", file=sys.stderr)
+    return len(pending) - failed, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Wikipedia-style articles for a list of topics")
+    parser.add_argument('topics', help="text file with one topic per line ('-' for stdin)")
+    parser.add_argument('--output', default='articles.jsonl', help="JSON lines file, or a directory (ending in /) for .md + .json files")
+    parser.add_argument('--concurrency', type=int, default=4, help="articles generated at once")
+    parser.add_argument('--tpm', type=int, default=0, help="tokens-per-minute budget shared by all workers (0 = the gateway's LLM_TPM)")
+    parser.add_argument('--parallel-sections', action='store_true', help="outline first, then write sections concurrently")
+    parser.add_argument('--no-cache', action='store_true', help="do not add finished articles to the Streamlit article cache")
+    args = parser.parse_args(argv)
+
+    text = sys.stdin.read() if args.topics == '-' else open(args.topics, encoding='utf-8').read()
+    ok, failed = run_batch(
+        load_topics(text), args.output,
+        concurrency=args.concurrency,
+        tokens_per_minute=args.tpm,
+        parallel_sections=args.parallel_sections,
+        use_cache=not args.no_cache
+    )
+    print(f"✅ {ok} generated, {failed} failed, results in {args.output}", file=sys.stderr)
+    return 1 if failed and not ok else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
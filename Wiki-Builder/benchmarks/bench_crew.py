@@ -0,0 +1,244 @@
+"""
+Offline benchmark for the Wiki-Builder crew.
+
+Runs the real `run_crew` (sequential and parallel-sections modes) against a
+local stub OpenAI endpoint with scripted agent replies and configurable
+latency, while the Data Extractor's website search hits a local fixture site
+through the real retrieval index (embeddings also come from the stub). Each
+task's wall time is split into LLM time (measured by the stub), search time
+(from the crew trace) and the remainder, which is orchestration overhead.
+Also records peak memory per run and section indexer throughput on large
+synthetic articles. Results are written as JSON so runs on different commits
+can be compared with --compare.
+
+    python benchmarks/bench_crew.py
+    python benchmarks/bench_crew.py --modes sequential --iterations 5 --llm-latency 0.2
+    python benchmarks/bench_crew.py --parse-only --sizes 200,800,3200
+    python benchmarks/bench_crew.py --compare benchmarks/results/old.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from servers import CrewScript, serve, make_site_handler, make_llm_handler
+from bench_sections import build_article, streamed
+from sections import index_sections
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline Wiki-Builder crew benchmark")
+    parser.add_argument('--modes', default='sequential,parallel', help="comma-separated crew modes")
+    parser.add_argument('--iterations', type=int, default=3, help="articles per mode")
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="stub LLM time to first token (s)")
+    parser.add_argument('--llm-tps', type=float, default=2000, help="stub LLM tokens per second")
+    parser.add_argument('--search-latency', type=float, default=0.02, help="fixture site response time (s)")
+    parser.add_argument('--searches', type=int, default=2, help="website searches the Data Extractor makes")
+    parser.add_argument('--article-kb', type=float, default=8, help="size of the scripted article")
+    parser.add_argument('--sections', type=int, default=6, help="sections in the scripted article / outline")
+    parser.add_argument('--sizes', default='50,200,800,1600', help="synthetic article sizes (KB) for the parse benchmark")
+    parser.add_argument('--parse-only', action='store_true', help="skip the crew runs (no crewai needed)")
+    parser.add_argument('--output', help="result JSON path (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--compare', help="previous result JSON to diff against")
+    return parser.parse_args()
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+def summarize(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {'n': 0}
+    return {
+        'n': len(samples),
+        'mean_ms': round(1000 * statistics.fmean(samples), 3),
+        'p50_ms': round(1000 * samples[len(samples) // 2], 3),
+        'max_ms': round(1000 * samples[-1], 3),
+    }
+
+def run_once(run_crew, mode, calls):
+    """One article; returns (seconds, setup seconds, trace, LLM calls made)"""
+    events = {}
+    del calls[:]
+    start = time.perf_counter()
+    raw = run_crew("Synthetic Topic", parallel_sections=mode == 'parallel', on_event=lambda kind, value: events.__setitem__(kind, value))
+    seconds = time.perf_counter() - start
+    if raw.startswith("Error in multi-agent crew execution"):
+        raise RuntimeError(raw)
+    return seconds, events.get('setup'), events.get('trace'), list(calls)
+
+# Per-task Latency (LLM time vs search time vs orchestration overhead)
+def bench_crew(run_crew, mode, iterations, calls):
+    totals, setups, saved = [], [], []
+    stages = {}
+    cold = None
+    for iteration in range(iterations):
+        seconds, setup, trace, run_calls = run_once(run_crew, mode, calls)
+        if cold is None:
+            cold = seconds  # first run builds agents and indexes the fixture pages
+        totals.append(seconds)
+        if setup is not None:
+            setups.append(setup)
+        saved.append(trace.get('tokens_saved', 0))
+        llm = {}
+        for call in run_calls:
+            llm.setdefault(call['stage'], []).append(call['seconds'])
+        for stage in trace['stages']:
+            name = stage['stage']
+            row = stages.setdefault(name, {'wall': [], 'llm': [], 'search': [], 'overhead': [], 'llm_calls': [],
+                                           'tool_calls': [], 'prompt_tokens': [], 'completion_tokens': []})
+            if name == 'sections':
+                # Writers run concurrently: overhead is measured per section writer
+                section_llm = llm.get('section', [])
+                per_llm = sum(section_llm) / max(1, len(section_llm))
+                for section in trace['sections']:
+                    row['overhead'].append(max(0.0, section['wall_seconds'] - per_llm))
+                spent = sum(section_llm)
+            else:
+                spent = sum(llm.get(name, []))
+                row['overhead'].append(max(0.0, stage['wall_seconds'] - spent - stage['search_seconds']))
+            row['wall'].append(stage['wall_seconds'])
+            row['llm'].append(spent)
+            row['search'].append(stage['search_seconds'])
+            row['llm_calls'].append(len(llm.get('section' if name == 'sections' else name, [])))
+            for key in ('tool_calls', 'prompt_tokens', 'completion_tokens'):
+                row[key].append(stage[key])
+        print(f"  {mode} #{iteration + 1}: {seconds:.3f}s " + ', '.join(
+            f"{s['stage']} {s['wall_seconds']:.3f}s" for s in trace['stages']))
+    return {
+        'total': summarize(totals),
+        'cold_ms': round(1000 * cold, 3),
+        'setup': summarize(setups),
+        'tokens_saved': round(statistics.fmean(saved), 1),
+        'stages': {
+            name: {
+                **{key: summarize(row[key]) for key in ('wall', 'llm', 'search', 'overhead')},
+                **{key: round(statistics.fmean(row[key]), 1) for key in ('llm_calls', 'tool_calls', 'prompt_tokens', 'completion_tokens')},
+            }
+            for name, row in stages.items()
+        },
+    }
+
+# Peak Memory (separate traced run, since tracemalloc slows everything it watches)
+def bench_memory(run_crew, mode, calls):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run_once(run_crew, mode, calls)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 2**20, 2)
+
+# Section Indexer Throughput (index_sections / streamed SectionIndex, which replaced parse_sections)
+def bench_parse(sizes, chunk=16, repeat=3):
+    rows = []
+    for kb in sizes:
+        md = build_article(kb)
+        real_mb = len(md.encode('utf-8')) / 2**20
+        full = min(timed(index_sections, md) for _ in range(repeat))
+        stream = min(timed(streamed, md, chunk) for _ in range(repeat))
+        rows.append({
+            'kb': round(real_mb * 1024, 1),
+            'sections': len(index_sections(md)),
+            'index_mb_per_sec': round(real_mb / full, 2),
+            'stream_mb_per_sec': round(real_mb / stream, 2),
+        })
+        print(f"  {real_mb * 1024:>7.0f}KB: index {real_mb / full:8.2f} MB/s, streamed ({chunk}-char chunks) {real_mb / stream:8.2f} MB/s")
+    return rows
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def compare(previous, current):
+    print(f"\nComparison vs {previous.get('commit')} ({previous.get('timestamp')}):")
+    for mode, result in current['crew'].items():
+        old = previous.get('crew', {}).get(mode)
+        if not old:
+            continue
+        for stage, stats in result['stages'].items():
+            old_stage = old['stages'].get(stage)
+            if not old_stage:
+                continue
+            for key in ('wall', 'overhead'):
+                before, after = old_stage[key].get('p50_ms'), stats[key].get('p50_ms')
+                if before is not None and after is not None:
+                    change = 100 * (after - before) / before if before else 0.0
+                    print(f"  {mode:<11} {stage:<14} {key:<9} p50 {before:>9.2f} → {after:>9.2f} ms ({change:+.1f}%)")
+    old_parse = {row['kb']: row for row in previous.get('parse', [])}
+    for row in current['parse']:
+        old = old_parse.get(row['kb'])
+        if old:
+            change = 100 * (row['index_mb_per_sec'] - old['index_mb_per_sec']) / old['index_mb_per_sec']
+            print(f"  parse {row['kb']:>8.0f}KB {old['index_mb_per_sec']:>9.2f} → {row['index_mb_per_sec']:>9.2f} MB/s ({change:+.1f}%)")
+
+def main():
+    args = parse_args()
+    crew_results, memory = {}, {}
+
+    if not args.parse_only:
+        _, site_url = serve(make_site_handler(args.search_latency))
+        calls = []
+        script = CrewScript(site_url, args.searches, args.article_kb, args.sections)
+        _, llm_url = serve(make_llm_handler(script, args.llm_latency, args.llm_tps, calls))
+
+        # Everything must be configured before the agents create their clients
+        workdir = tempfile.mkdtemp(prefix='wiki-bench-')
+        os.environ.update({
+            'OPENAI_API_KEY': 'benchmark',
+            'OPENAI_BASE_URL': llm_url + '/v1',
+            'WIKI_INDEX_PATH': os.path.join(workdir, 'index.sqlite3'),
+            'WIKI_TRACE_DIR': os.path.join(workdir, 'traces'),
+            'WIKI_CACHE': '0',
+            # Every iteration must reach the stub: no response cache, no rate limit
+            'LLM_CACHE': '0',
+            'LLM_RPM': '0',
+            'LLM_TPM': '0',
+        })
+        from crew import run_crew
+
+        for mode in args.modes.split(','):
+            print(f"Crew ({mode}), {args.iterations} articles...")
+            crew_results[mode] = bench_crew(run_crew, mode, args.iterations, calls)
+            memory[mode] = bench_memory(run_crew, mode, calls)
+
+    print("Section indexer throughput:")
+    parse = bench_parse([int(size) for size in args.sizes.split(',')])
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'crew': crew_results,
+        'parse': parse,
+        'memory': {
+            'peak_traced_mb': memory,
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        },
+    }
+
+    output = args.output or os.path.join(HERE, 'results', f"{result['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+if __name__ == '__main__':
+    main()
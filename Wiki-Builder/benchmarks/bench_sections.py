@@ -0,0 +1,118 @@
+"""
+Section indexer scaling benchmark.
+
+Builds synthetic articles from ~25 KB to ~1.6 MB and times the previous
+line-by-line `parse_sections` (string concatenation per line) against
+SectionIndex, both on the whole text and fed in small streamed chunks the
+way the Streamlit page receives tokens. Time per KB should stay flat for
+SectionIndex as articles grow.
+
+    python benchmarks/bench_sections.py
+    python benchmarks/bench_sections.py --paragraphs 100000    # one huge section
+    python benchmarks/bench_sections.py --sizes 50,200,800 --chunk 8 --output results.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from sections import SectionIndex, index_sections
+
+WORDS = ("empire senate trade roman culture history war reform city republic law "
+         "army province temple coin road aqueduct emperor consul citizen").split()
+
+def parse_sections_legacy(md):
+    """The original main.py implementation, kept here as the baseline"""
+    sections = []
+    current = None
+    for line in md.splitlines():
+        m = re.match(r"^(#{1,3})\s+(.*)", line)
+        if m:
+            if current:
+                sections.append(current)
+            hashes = m.group(1)
+            heading = m.group(2).strip()
+            anchor = re.sub(r'[\s\W]+','-', heading.lower())
+            level = {1: 'h1', 2: 'h2', 3: 'h3'}[len(hashes)]
+            current = {'level': level, 'anchor': anchor, 'heading': heading, 'content': ''}
+        else:
+            if current:
+                current['content'] += line + "\n"
+    if current:
+        sections.append(current)
+    return sections
+
+def build_article(kb, paragraphs=40, seed=7):
+    """Markdown of roughly `kb` KB; a huge `paragraphs` value gives one giant section"""
+    rng = random.Random(seed)
+    lines = ["# Synthetic Topic", ""]
+    size = 0
+    section = 0
+    while size < kb * 1024:
+        section += 1
+        lines += [f"## Section {section}", "---", ""]
+        for paragraph in range(paragraphs):
+            if size >= kb * 1024:
+                break
+            if paragraph % 15 == 0 and paragraphs <= 1000:
+                lines += [f"### Part {paragraph // 15 + 1}", ""]
+            line = ' '.join(rng.choice(WORDS) for _ in range(30)) + '.'
+            lines += [line, ""]
+            size += len(line) + 2
+    return '\n'.join(lines) + '\n'
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def streamed(md, chunk):
+    index = SectionIndex()
+    for i in range(0, len(md), chunk):
+        index.feed(md[i:i + chunk])
+    return index.close().sections()
+
+def main():
+    parser = argparse.ArgumentParser(description="SectionIndex scaling benchmark")
+    parser.add_argument('--sizes', default='25,50,100,200,400,800,1600', help="article sizes in KB")
+    parser.add_argument('--chunk', type=int, default=16, help="characters per streamed chunk")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--paragraphs', type=int, default=40, help="paragraphs per ## section (e.g. 100000 for one huge section)")
+    parser.add_argument('--output', help="optional JSON result path")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'size':>8} {'sections':>9} {'legacy ms':>10} {'index ms':>9} {'stream ms':>10} {'µs/KB legacy':>13} {'µs/KB index':>12} {'µs/KB stream':>13}")
+    for kb in (int(size) for size in args.sizes.split(',')):
+        md = build_article(kb, args.paragraphs)
+        real_kb = len(md) / 1024
+        assert len(index_sections(md)) == len(streamed(md, args.chunk))
+        legacy = best_of(lambda: parse_sections_legacy(md), args.repeat)
+        full = best_of(lambda: index_sections(md), args.repeat)
+        stream = best_of(lambda: streamed(md, args.chunk), args.repeat)
+        row = {
+            'kb': round(real_kb, 1),
+            'sections': len(index_sections(md)),
+            'legacy_ms': round(legacy * 1000, 3),
+            'index_ms': round(full * 1000, 3),
+            'stream_ms': round(stream * 1000, 3),
+        }
+        rows.append(row)
+        print(f"{real_kb:>6.0f}KB {row['sections']:>9} {row['legacy_ms']:>10.2f} {row['index_ms']:>9.2f} {row['stream_ms']:>10.2f} "
+              f"{1e6 * legacy / real_kb:>13.1f} {1e6 * full / real_kb:>12.1f} {1e6 * stream / real_kb:>13.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'chunk': args.chunk, 'paragraphs': args.paragraphs, 'rows': rows}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+WORDS = ("empire senate trade roman culture history war reform city republic law "
+         "army province temple coin road aqueduct emperor consul citizen").split()
+SECTION_HEADINGS = ["Background", "History", "Key Features", "Impact", "Legacy", "Current Status",
+                    "Geography", "Economy", "Culture", "Reception"]
+EMBED_DIM = 64
+
+def sentences(rng, count, words=24):
+    return ' '.join(' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.' for _ in range(count))
+
+# Scripted crew (what each agent "answers", in CrewAI's ReAct text format)
+class CrewScript:
+    """
+    Picks the reply for a chat request from the agent role in its system
+    prompt: the Data Extractor runs `searches` website searches against the
+    fixture site and then reports notes, the Summarizer returns a summary (or
+    a JSON outline in parallel mode) and the Page Formatter writes an article
+    of about `article_kb` KB (or one section of it).
+    """
+
+    def __init__(self, site_url, searches=2, article_kb=8, sections=6, seed=7):
+        self.site_url = site_url
+        self.searches = searches
+        self.article_kb = article_kb
+        self.sections = sections
+        self.seed = seed
+
+    def reply(self, messages):
+        text = '\n'.join(str(m.get('content') or '') for m in messages)
+        rng = random.Random(self.seed)
+        if 'You are Data Extractor' in text:
+            done = len(set(re.findall(r'bench-query-\d+', text)))
+            if done < self.searches:
+                query = f"bench-query-{done + 1}"
+                page = f"{self.site_url}/page/{done % 3 + 1}"
+                return 'extraction', (
+                    f"Thought: I should search a reference page.\n"
+                    f"Action: Search in a specific website\n"
+                    f"Action Input: {json.dumps({'search_query': query, 'website': page})}"
+                )
+            return 'extraction', f"Thought: I now know the final answer\nFinal Answer: {sentences(rng, 20)}"
+        if 'You are Summarizer' in text:
+            if 'article outline' in text:
+                outline = {
+                    'title': 'Synthetic Topic',
+                    'lead': sentences(rng, 4),
+                    'sections': [
+                        {'heading': SECTION_HEADINGS[i % len(SECTION_HEADINGS)], 'subsections': [], 'notes': sentences(rng, 3)}
+                        for i in range(self.sections)
+                    ],
+                }
+                return 'outline', f"Thought: I now know the final answer\nFinal Answer: {json.dumps(outline)}"
+            return 'summarization', f"Thought: I now know the final answer\nFinal Answer: {sentences(rng, 30)}"
+        if 'You are Page Formatter' in text:
+            match = re.search(r"Write the '([^']+)' section", text)
+            if match:
+                body = self.article(rng, self.article_kb / max(1, self.sections), [match.group(1)], title=False)
+                return 'section', f"Thought: I now know the final answer\nFinal Answer: {body}"
+            body = self.article(rng, self.article_kb, SECTION_HEADINGS[:self.sections])
+            return 'formatting', f"Thought: I now know the final answer\nFinal Answer: {body}"
+        return 'other', f"Thought: I now know the final answer\nFinal Answer: {sentences(rng, 3)}"
+
+    def article(self, rng, kb, headings, title=True):
+        parts = ["# Synthetic Topic", sentences(rng, 4)] if title else []
+        per_section = max(1, int(kb * 1024 / len(headings) / 160))
+        for heading in headings:
+            parts += [f"## {heading}", "---"]
+            parts += [sentences(rng, 1) for _ in range(per_section)]
+        return '\n\n'.join(parts)
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+# Research pages the Data Extractor's search tool fetches
+def make_site_handler(latency=0.0, paragraphs=60):
+    rng = random.Random(11)
+    pages = {
+        f"/page/{n}": (f"<html><body><h1>Page {n}</h1>"
+                       + ''.join(f"<p>{sentences(rng, 3)}</p>" for _ in range(paragraphs))
+                       + "</body></html>").encode()
+        for n in range(1, 4)
+    }
+
+    class SiteHandler(QuietHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path in pages:
+                self.send_body(200, pages[self.path], 'text/html; charset=utf-8')
+            else:
+                self.send_body(404, b'not found', 'text/plain')
+
+    return SiteHandler
+
+# Stub OpenAI endpoint: scripted chat completions (plain or streamed) + hash embeddings
+def make_llm_handler(script, first_token_latency, tokens_per_second, calls):
+    """`calls` collects one {'stage', 'seconds', 'completion_tokens'} row per chat request"""
+    lock = threading.Lock()
+
+    class LLMHandler(QuietHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path.rstrip('/').endswith('/embeddings'):
+                self.embeddings(request)
+                return
+            start = time.perf_counter()
+            stage, content = script.reply(request.get('messages', []))
+            words = content.split(' ')
+            tokens = [w + ' ' for w in words[:-1]] + [words[-1]]
+            prompt_tokens = sum(len(str(m.get('content') or '')) for m in request.get('messages', [])) // 4
+            time.sleep(first_token_latency)
+            if request.get('stream'):
+                self.stream(request, tokens)
+            else:
+                time.sleep(len(tokens) / tokens_per_second)
+                self.send_body(200, json.dumps({
+                    'id': 'bench', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': request.get('model', 'gpt-4o'),
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': content}}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                              'total_tokens': prompt_tokens + len(tokens)}
+                }).encode(), 'application/json')
+            with lock:
+                calls.append({'stage': stage, 'seconds': time.perf_counter() - start, 'completion_tokens': len(tokens)})
+
+        def stream(self, request, tokens):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            delay = 1 / tokens_per_second
+            for token in tokens:
+                chunk = {
+                    'id': 'bench', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                    'model': request.get('model', 'gpt-4o'),
+                    'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def embeddings(self, request):
+            texts = request.get('input') or []
+            if isinstance(texts, str):
+                texts = [texts]
+            data = [{'object': 'embedding', 'index': i, 'embedding': hash_vector(text)} for i, text in enumerate(texts)]
+            self.send_body(200, json.dumps({
+                'object': 'list', 'data': data, 'model': request.get('model'),
+                'usage': {'prompt_tokens': 0, 'total_tokens': 0}
+            }).encode(), 'application/json')
+
+    return LLMHandler
+
+def hash_vector(text):
+    """Deterministic bag-of-words vector, so similar text still scores higher"""
+    vector = [0.0] * EMBED_DIM
+    for word in text.lower().split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % EMBED_DIM] += 1.0
+    return vector
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+def serve(handler):
+    """Starts a threaded local server on a free port; returns (server, base_url)"""
+    server = QuietServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
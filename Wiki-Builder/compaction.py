@@ -0,0 +1,143 @@
+# compaction.py - Shrinks a task's output before the next agent reads it as context
+
+import os
+import re
+import time
+from gateway import estimate_tokens
+
+RESEARCH_BUDGET = int(os.getenv('WIKI_RESEARCH_TOKENS', 2500))
+SUMMARY_BUDGET = int(os.getenv('WIKI_SUMMARY_TOKENS', 2000))
+SIMILARITY = 0.8
+
+HEADING = re.compile(r'^\s*(#{1,6}\s+\S.*|\*\*[^*]+\*\*:?|[A-Z][^.!?]{0,60}:)\s*$')
+BULLET = re.compile(r'^\s*([-*•]|\d+[.)])\s+')
+SCORE_PREFIX = re.compile(r'^\s*\[\d+\.\d+\]\s*')
+REACT = re.compile(r'^\s*(Thought|Action|Action Input|Observation)\s*:', re.I)
+BOILERPLATE = re.compile(
+    r'cookie|privacy policy|terms of (use|service)|all rights reserved|sign (in|up)|log ?in\b|subscribe|newsletter|'
+    r'skip to (main )?content|click here|share (this|on)|follow us|advertisement|enable javascript|read more|back to top',
+    re.I
+)
+SENTENCE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(\[])')
+FACT = re.compile(r'\b\d[\d,.]*\b|\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*')
+
+def shingles(words):
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+def heading_level(heading):
+    """1-6 for markdown headings, 7 for bold / 'Label:' lines"""
+    hashes = len(heading) - len(heading.lstrip('#'))
+    return hashes if hashes else 7
+
+def fact_density(sentence):
+    """Numbers, dates and capitalized names per token: what compaction tries hardest to keep"""
+    return len(FACT.findall(sentence)) / max(1, estimate_tokens(sentence))
+
+def compact(text, budget):
+    """
+    Returns (compacted text, stats). Drops agent chatter and short boilerplate
+    sentences, removes sentences that repeat (or nearly repeat, by word
+    shingle overlap) one already kept, then, while over `budget` tokens,
+    drops the sentences with the fewest numbers and names. Headings, bullet
+    structure and the order of what is kept are preserved; text with nothing
+    to drop is returned as it came.
+    """
+    stats = {'tokens_before': estimate_tokens(text), 'duplicates': 0, 'boilerplate': 0, 'trimmed': 0}
+
+    # Paragraphs (or bullets) as lists of lines; a heading line is always a paragraph of its own
+    paragraphs = []
+    for paragraph in re.split(r'\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)])\s)', text):
+        lines = []
+        for line in paragraph.splitlines():
+            line = SCORE_PREFIX.sub('', line).strip()
+            if REACT.match(line):
+                stats['boilerplate'] += 1
+            elif HEADING.match(line):
+                paragraphs += [lines, line]
+                lines = []
+            elif line:
+                lines.append(line)
+        paragraphs.append(lines)
+
+    # Blocks: [prefix, [sentence, ...]] or a heading string
+    blocks = []
+    seen = set()
+    kept_shingles = []
+    for lines in paragraphs:
+        if isinstance(lines, str):
+            blocks.append(lines)
+            continue
+        if not lines:
+            continue
+        joined = ' '.join(lines)
+        bullet = BULLET.match(joined)
+        prefix = bullet.group(0) if bullet else ''
+        sentences = []
+        for sentence in SENTENCE.split(joined[len(prefix):]):
+            sentence = sentence.strip()
+            words = re.findall(r'\w+', sentence.lower())
+            if not words or (len(words) < 12 and BOILERPLATE.search(sentence)):
+                stats['boilerplate'] += 1
+                continue
+            key = ' '.join(words)
+            if key in seen:
+                stats['duplicates'] += 1
+                continue
+            if len(words) >= 6:
+                mine = shingles(words)
+                if any(len(mine & other) / len(mine | other) >= SIMILARITY for other in kept_shingles):
+                    stats['duplicates'] += 1
+                    continue
+                kept_shingles.append(mine)
+            seen.add(key)
+            sentences.append(sentence)
+        if sentences:
+            blocks.append([prefix, sentences])
+
+    # Token budget: keep the densest sentences, in their original order
+    sentences = [(b, i) for b, block in enumerate(blocks) if isinstance(block, list) for i in range(len(block[1]))]
+    used = sum(estimate_tokens(block) for block in blocks if isinstance(block, str))
+    used += sum(estimate_tokens(blocks[b][1][i]) + 1 for b, i in sentences)
+    if used > budget:
+        dropped = set()
+        for b, i in sorted(sentences, key=lambda pos: fact_density(blocks[pos[0]][1][pos[1]])):
+            if used <= budget or len(dropped) == len(sentences) - 1:
+                break  # always leave at least the densest sentence
+            used -= estimate_tokens(blocks[b][1][i]) + 1
+            dropped.add((b, i))
+        stats['trimmed'] = len(dropped)
+        for b, block in enumerate(blocks):
+            if isinstance(block, list):
+                block[1] = [s for i, s in enumerate(block[1]) if (b, i) not in dropped]
+
+    # Nothing was dropped: hand the text back as it came rather than reflowed
+    if not (stats['duplicates'] or stats['boilerplate'] or stats['trimmed']):
+        stats['tokens_after'] = stats['tokens_before']
+        stats['tokens_saved'] = 0
+        return text, stats
+
+    # Rebuild, leaving out headings whose content was all dropped
+    parts = []
+    for block in reversed(blocks):
+        if isinstance(block, list):
+            if block[1]:
+                parts.append((99, block[0] + ' '.join(block[1])))
+        elif parts and heading_level(block) < parts[-1][0]:
+            parts.append((heading_level(block), block))
+    compacted = '\n\n'.join(part for _, part in reversed(parts)) or text.strip()
+    stats['tokens_after'] = estimate_tokens(compacted)
+    stats['tokens_saved'] = max(0, stats['tokens_before'] - stats['tokens_after'])
+    return compacted, stats
+
+def compact_task_output(output, budget):
+    """
+    Compacts a finished CrewAI task output in place. Called from the crew's
+    task callback, before the next task reads this one as its context.
+    Returns the stats, or None when compaction is off (WIKI_COMPACT=0).
+    """
+    if os.getenv('WIKI_COMPACT', '1') == '0' or not getattr(output, 'raw', None):
+        return None
+    start = time.perf_counter()
+    output.raw, stats = compact(output.raw, budget)
+    stats['seconds'] = round(time.perf_counter() - start, 4)
+    return stats
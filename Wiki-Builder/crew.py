@@ -1,9 +1,168 @@
 # crew.py - Multi-agent Wikipedia Builder with proper CrewAI implementation
 
+import contextvars
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager, ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from pydantic import BaseModel
 from crewai import Crew, Task, Process
-from agents import create_data_extractor, create_summarizer, create_page_formatter
+from agents import create_data_extractor, create_summarizer, create_page_formatter, agent_pool
+import tracing
+from compaction import compact_task_output, RESEARCH_BUDGET, SUMMARY_BUDGET
+from gateway import fresh_responses, usage_dict
+
+MAX_PARALLEL_SECTIONS = 4
+
+SEED_TIMEOUT = 3.0
+
+def resolve_seed(seed, timeout=SEED_TIMEOUT):
+    """Seed summary from a dict, a Future of one (waited on briefly), or None"""
+    if hasattr(seed, 'result'):
+        try:
+            seed = seed.result(timeout=timeout)
+        except Exception as e:
+            print(f"[Seed Error] {e}")
+            return None
+    return seed
+
+def seed_context(seed):
+    if not seed or not seed.get('extract'):
+        return ""
+    return f"""
+        REFERENCE SUMMARY ({seed.get('url') or 'Wikipedia'}):
+        {seed['extract']}
+
+        Treat this summary as established background. Spend your searches only on what it does not
+        cover (details, dates, figures, recent developments) - 2 searches are usually enough.
+        """
+
+def build_extraction_task(topic, data_extractor, seed=None):
+    return Task(
+        description=f"""Search the web thoroughly for information about '{topic}'. 
+        {seed_context(seed)}
+        Extract comprehensive information including:
+        - Historical background and origins
+        - Key events, dates, and milestones  
+        - Important figures and their roles
+        - Current status and developments
+        - Significant facts and statistics
+        - Cultural, social, or scientific impact
+
+        Use your web search tool to gather factual, verifiable information from multiple sources.
+        Only perform up to 3 web searches to gather facts.
+        Organize your findings clearly with specific details, dates, and facts.
+        Keep each search result concise and relevant.
+        """,
+
+        expected_output=f"Comprehensive research data about {topic} including historical facts, key events, important figures, dates, and current information gathered from web sources.",
+
+        agent=data_extractor
+    )
+
+def result_text(result):
+    """Extracts the final text from a crew result across CrewAI versions"""
+    if hasattr(result, 'raw'):
+        content = result.raw
+    elif hasattr(result, 'result'):
+        content = result.result
+    elif isinstance(result, str):
+        content = result
+    else:
+        content = str(result)
+    return content.strip()
+
+# Live progress: run_crew(..., on_event=fn) calls fn('stage', message) as agents
+# hand over, fn('token', text) as article text is produced, fn('setup', seconds)
+# once agents are ready, fn('usage', {...tokens}) after every crew kickoff and
+# fn('trace', {...}) with the per-stage breakdown when the article is done
+STAGES = [
+    "🔎 Data Extractor is researching the web…",
+    "🗂️ Summarizer is organizing the research…",
+    "✍️ Page Formatter is writing the article…",
+]
+
+_stream_listeners = {}
+_stream_hook_installed = False
+_stream_lock = threading.Lock()
+
+def install_stream_hook():
+    """Routes streamed LLM chunks to the listener registered by the emitting thread (once per process)"""
+    global _stream_hook_installed
+    with _stream_lock:
+        if not _stream_hook_installed:
+            try:
+                from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+            except ImportError:
+                return False
+
+            def forward(source, event):
+                listener = _stream_listeners.get(threading.get_ident())
+                if listener:
+                    listener(event.chunk)
+
+            crewai_event_bus.on(LLMStreamChunkEvent)(forward)
+            _stream_hook_installed = True
+    return True
+
+@contextmanager
+def streaming_to(callback):
+    """Sends LLM chunks streamed by this thread's crew to `callback`; yields False if streaming is unavailable"""
+    if callback is None or not install_stream_hook():
+        yield False
+        return
+    _stream_listeners[threading.get_ident()] = callback
+    try:
+        yield True
+    finally:
+        _stream_listeners.pop(threading.get_ident(), None)
 
-def run_crew(topic):
+class FinalAnswerStream:
+    """
+    Forwards only the final answer of a streamed ReAct reply: chunks are held
+    back until 'Final Answer:' has gone by, so 'Thought: ...' never reaches
+    the article and the H1 and lead are the first text SectionIndex sees.
+    """
+    MARKER = 'Final Answer:'
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.pending = ''
+        self.started = False
+        self.emitted = False
+
+    def __call__(self, chunk):
+        if not self.started:
+            self.pending += chunk
+            at = self.pending.find(self.MARKER)
+            if at < 0:
+                return
+            self.started = True
+            chunk, self.pending = self.pending[at + len(self.MARKER):], ''
+        if not self.emitted:
+            chunk = chunk.lstrip()  # the space (or newline) after the marker
+            if not chunk:
+                return
+            self.emitted = True
+        self.callback(chunk)
+
+def report_usage(result, on_event=None):
+    """Reports a kickoff's token usage as a 'usage' event (one per crew; consumers add them up)"""
+    usage = getattr(result, 'token_usage', None)
+    if on_event and usage is not None:
+        on_event('usage', usage_dict(usage))
+
+def report_setup(start, on_event=None):
+    """Logs (and reports as a 'setup' event) the time spent building agents and tasks before kickoff"""
+    seconds = time.perf_counter() - start
+    print(f"⏱️ Crew setup: {seconds * 1000:.1f} ms (agents built {agent_pool.created}, reused {agent_pool.reused})")
+    if on_event:
+        on_event('setup', seconds)
+
+def run_crew(topic, parallel_sections=False, max_parallel=MAX_PARALLEL_SECTIONS, on_event=None, seed=None, fresh=False):
     """
     Runs the 3-agent CrewAI system to generate a Wikipedia-style article
 
@@ -11,36 +170,36 @@ def run_crew(topic):
     1. Data Extractor → Searches web for information about the topic
     2. Summarizer → Organizes the extracted data into structured sections  
     3. Page Formatter → Creates the final polished Wikipedia article
+
+    With parallel_sections=True the summarizer returns an outline instead and
+    each section is written by its own formatter concurrently (see run_crew_parallel).
+
+    `seed` is an optional Wikipedia summary (or a Future of one, see
+    wiki_summary.fetch_summary_async) handed to the Data Extractor as
+    starting context so it needs fewer searches.
+
+    Model answers may come from the LLM gateway's response cache when a
+    prompt repeats exactly; fresh=True (Regenerate) always asks the model.
     """
 
+    if fresh:
+        with fresh_responses():
+            return run_crew(topic, parallel_sections, max_parallel, on_event, seed)
+
+    if parallel_sections:
+        return run_crew_parallel(topic, max_parallel=max_parallel, on_event=on_event, seed=seed)
+
+    trace = tracing.Trace(topic, 'sequential')
+    agents = ExitStack()
     try:
-        # Create the 3 agents
-        data_extractor = create_data_extractor()
-        summarizer = create_summarizer()
-        page_formatter = create_page_formatter()
-
-        # TASK 1: Data Extraction
-        extraction_task = Task(
-            description=f"""Search the web thoroughly for information about '{topic}'. 
-
-            Extract comprehensive information including:
-            - Historical background and origins
-            - Key events, dates, and milestones  
-            - Important figures and their roles
-            - Current status and developments
-            - Significant facts and statistics
-            - Cultural, social, or scientific impact
-
-            Use your web search tool to gather factual, verifiable information from multiple sources.
-            Only perform up to 3 web searches to gather facts.
-            Organize your findings clearly with specific details, dates, and facts.
-            Keep each search result concise and relevant.
-            """,
-
-            expected_output=f"Comprehensive research data about {topic} including historical facts, key events, important figures, dates, and current information gathered from web sources.",
-
-            agent=data_extractor
-        )
+        # Check out the 3 agents from the warm pool (the formatter streams tokens when someone is listening)
+        setup_start = time.perf_counter()
+        data_extractor = agents.enter_context(agent_pool.checkout(create_data_extractor))
+        summarizer = agents.enter_context(agent_pool.checkout(create_summarizer))
+        page_formatter = agents.enter_context(agent_pool.checkout(create_page_formatter, stream=on_event is not None))
+
+        # TASK 1: Data Extraction (seeded with the Wikipedia summary when it arrived in time)
+        extraction_task = build_extraction_task(topic, data_extractor, resolve_seed(seed))
 
         # TASK 2: Data Summarization and Organization
         summarization_task = Task(
@@ -101,33 +260,198 @@ def run_crew(topic):
             context=[summarization_task]
         )
 
+        completed = []
+        stage_agents = [('extraction', data_extractor), ('summarization', summarizer), ('formatting', page_formatter)]
+        budgets = {'extraction': RESEARCH_BUDGET, 'summarization': SUMMARY_BUDGET}
+
+        def task_done(output):
+            name, agent = stage_agents[len(completed)]
+            trace.stage_done(name, agent.role, tracing.agent_usage(agent))
+            # The next task reads this output as its context: compact it first
+            if name in budgets:
+                trace.compacted(name, compact_task_output(output, budgets[name]))
+            completed.append(output)
+            if on_event and len(completed) < len(STAGES):
+                on_event('stage', STAGES[len(completed)])
+
         # Create and execute the crew
         crew = Crew(
             agents=[data_extractor, summarizer, page_formatter],
             tasks=[extraction_task, summarization_task, formatting_task],
             process=Process.sequential,
-            verbose=True
+            verbose=True,
+            task_callback=task_done
         )
 
         # Execute the crew and get results
-        result = crew.kickoff()
+        report_setup(setup_start, on_event)
+        if on_event:
+            on_event('stage', STAGES[0])
+        answer = FinalAnswerStream(lambda chunk: on_event('token', chunk)) if on_event else None
+        with trace.active(), streaming_to(answer) as streamed:
+            result = crew.kickoff()
+        report_usage(result, on_event)
+
+        # Extract the final article content (sent whole if no final answer was streamed)
+        content = result_text(result)
+        if on_event and not (streamed and answer.emitted):
+            on_event('token', content)
+        trace.finish()
+        return content
+
+    except Exception as e:
+        error_msg = f"Error in multi-agent crew execution: {str(e)}"
+        print(error_msg)
+        trace.finish(ok=False, error=str(e))
+        return error_msg
+    finally:
+        agents.close()
+        tracing.publish(trace, on_event)
+
+# Parallel section mode (outline first, then one formatter per section)
+class OutlineSection(BaseModel):
+    heading: str
+    subsections: List[str] = []
+    notes: str
+
+class Outline(BaseModel):
+    title: str
+    lead: str
+    sections: List[OutlineSection]
+
+def parse_outline(result):
+    """Reads the summarizer's outline, falling back to the JSON in its raw text"""
+    outline = getattr(result, 'pydantic', None)
+    if isinstance(outline, Outline):
+        return outline
+    match = re.search(r'\{.*\}', result_text(result), re.S)
+    return Outline(**json.loads(match.group(0))) if match else None
+
+def write_section(topic, section, on_event=None, trace=None):
+    """Runs a one-task crew that writes a single `##` section from its outline notes"""
+    start = time.perf_counter()
+    with agent_pool.checkout(create_page_formatter) as writer:
+        subsections = ', '.join(section.subsections) or 'none needed'
+        task = Task(
+            description=f"""Write the '{section.heading}' section of a Wikipedia-style article about '{topic}'.
+
+            Facts to cover (from the research summary):
+            {section.notes}
+
+            FORMAT REQUIREMENTS:
+            - Start with exactly: ## {section.heading}
+            - Follow the heading with a horizontal rule (---)
+            - Suggested ### subsections: {subsections}
+            - 2-4 substantial paragraphs in neutral, encyclopedic tone with specific dates, names and facts
+            - Do not repeat the article title or write other sections
+
+            CRITICAL: Return ONLY this section's markdown.""",
 
-        # Extract the final article content
-        if hasattr(result, 'raw'):
-            content = result.raw
-        elif hasattr(result, 'result'):
-            content = result.result  
-        elif isinstance(result, str):
-            content = result
-        else:
-            content = str(result)
+            expected_output=f"The '{section.heading}' section of the {topic} article in markdown, section text only.",
 
-        return content.strip()
+            agent=writer
+        )
+        result = Crew(agents=[writer], tasks=[task], process=Process.sequential, verbose=True).kickoff()
+        report_usage(result, on_event)
+        if trace:
+            trace.section_done(section.heading, time.perf_counter() - start, usage_dict(getattr(result, 'token_usage', None)))
+        text = result_text(result)
+        if not text.startswith('## '):
+            text = f"## {section.heading}\n\n---\n{text}"
+        return text
+
+def run_crew_parallel(topic, max_parallel=MAX_PARALLEL_SECTIONS, on_event=None, seed=None):
+    """
+    Same research as run_crew, but the summarizer returns an outline and the
+    sections are written concurrently (at most `max_parallel` at a time),
+    then stitched back together in outline order. The formatting stage
+    takes as long as its longest section rather than the sum of all of them.
+    """
+
+    trace = tracing.Trace(topic, 'parallel')
+    agents = ExitStack()
+    try:
+        setup_start = time.perf_counter()
+        data_extractor = agents.enter_context(agent_pool.checkout(create_data_extractor))
+        summarizer = agents.enter_context(agent_pool.checkout(create_summarizer))
+
+        extraction_task = build_extraction_task(topic, data_extractor, resolve_seed(seed))
+
+        outline_task = Task(
+            description=f"""Take the extracted data about '{topic}' and turn it into an article outline.
+
+            Return JSON with:
+            - "title": the article title
+            - "lead": a 1-paragraph encyclopedic overview defining the topic
+            - "sections": 4-7 sections in reading order (e.g. Background, History, Key Features,
+              Impact, Current Status), each with "heading", optional "subsections" (list of
+              ### headings) and "notes": the key points, dates, figures and facts that section must cover
+
+            The notes are all a section writer will see, so make each one self-contained.""",
+
+            expected_output=f"A JSON outline of the {topic} article: title, lead and ordered sections with notes.",
+
+            agent=summarizer,
+            context=[extraction_task],
+            output_pydantic=Outline
+        )
+
+        emit = on_event or (lambda kind, value: None)
+        stage_agents = [('extraction', data_extractor), ('outline', summarizer)]
+
+        def task_done(output):
+            name, agent = stage_agents[len(trace.stages)]
+            trace.stage_done(name, agent.role, tracing.agent_usage(agent))
+            if name == 'extraction':
+                # The outline is structured JSON the section writers need whole; only research is compacted
+                trace.compacted(name, compact_task_output(output, RESEARCH_BUDGET))
+                emit('stage', "🗂️ Summarizer is drafting the outline…")
+
+        crew = Crew(
+            agents=[data_extractor, summarizer],
+            tasks=[extraction_task, outline_task],
+            process=Process.sequential,
+            verbose=True,
+            task_callback=task_done
+        )
+        report_setup(setup_start, on_event)
+        emit('stage', STAGES[0])
+        with trace.active():
+            result = crew.kickoff()
+        report_usage(result, on_event)
+        outline = parse_outline(result)
+        agents.close()  # research agents go back to the pool while sections are written
+        if not outline or not outline.sections:
+            raise ValueError("Summarizer did not return a usable outline")
+
+        head = f"# {outline.title or topic}\n\n{outline.lead.strip()}"
+        emit('token', head)
+        emit('stage', f"✍️ Writing {len(outline.sections)} sections in parallel…")
+
+        # Sections run concurrently; they are emitted and stitched in outline order
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(outline.sections)))) as pool:
+            # Each writer runs in a copy of this context, so fresh_responses() reaches it too
+            futures = [
+                pool.submit(contextvars.copy_context().run, write_section, topic, section, on_event, trace)
+                for section in outline.sections
+            ]
+            sections = []
+            for done, future in enumerate(futures, 1):
+                sections.append(future.result())
+                emit('token', '\n\n' + sections[-1])
+                emit('stage', f"✍️ {done}/{len(futures)} sections written…")
+
+        trace.finish()
+        return '\n\n'.join([head, *sections]).strip()
 
     except Exception as e:
         error_msg = f"Error in multi-agent crew execution: {str(e)}"
         print(error_msg)
+        trace.finish(ok=False, error=str(e))
         return error_msg
+    finally:
+        agents.close()
+        tracing.publish(trace, on_event)
 
 # Test function for debugging
 def test_crew():
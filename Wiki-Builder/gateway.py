@@ -0,0 +1,8 @@
+# gateway.py - Wiki-Builder's handle on the LLM gateway shared with Website_Auditor (llm_gateway.py at the repository root)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_gateway import get_gateway, fresh_responses, estimate_tokens, usage_dict
@@ -2,9 +2,12 @@ import streamlit as st
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-import requests
-import re
-from crew import run_crew
+import queue
+import threading
+import time
+from article_cache import get_article_cache
+from sections import SectionIndex, index_sections
+from wiki_summary import fetch_summary_async
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -12,7 +15,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 st.set_page_config(page_title="Wikipedia Builder", page_icon="📖", layout="wide", initial_sidebar_state="expanded")
 
 # Session state
-for key in ("result", "sections", "headings", "image_url", "generated_time", "topic"):
+for key in ("result", "sections", "headings", "image_url", "generated_time", "topic", "cached_at", "trace"):
     if key not in st.session_state:
         if key in ("sections", "headings"):
             st.session_state[key] = []
@@ -33,32 +36,132 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def fetch_image(topic):
-    try:
-        r = requests.get(f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}", timeout=5)
-        return r.json().get('thumbnail', {}).get('source')
-    except:
-        return None
-
-def parse_sections(md):
-    sections = []
-    current = None
-    for line in md.splitlines():
-        m = re.match(r"^(#{1,3})\s+(.*)", line)
-        if m:
-            if current:
-                sections.append(current)
-            hashes = m.group(1)
-            heading = m.group(2).strip()
-            anchor = re.sub(r'[\s\W]+','-', heading.lower())
-            level = {1: 'h1', 2: 'h2', 3: 'h3'}[len(hashes)]
-            current = {'level': level, 'anchor': anchor, 'heading': heading, 'content': ''}
+def render_toc(headings):
+    st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
+    st.markdown('<div class="toc-heading">📋 Table of Contents</div>', unsafe_allow_html=True)
+    if headings:
+        for level, heading, anchor in headings:
+            depth = int(level[1:])
+            indent = f'margin-left:{depth - 2}em;' if depth > 2 else ''
+            st.markdown(
+                f'<div class="toc-item" style="{indent}"><a href="#{anchor}">🔗 {heading}</a></div>',
+                unsafe_allow_html=True
+            )
+    else:
+        st.markdown('<div class="toc-item"><em>Generate an article to see contents</em></div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def render_trace(trace):
+    """Per-stage breakdown of the last run: where the time and tokens went"""
+    if not trace or not trace.get('stages'):
+        return
+    st.markdown('<div class="toc-heading">⏱️ Stage Breakdown</div>', unsafe_allow_html=True)
+    total = trace['wall_seconds'] or 1
+    st.table([
+        {
+            'Stage': s['stage'],
+            'Time (s)': s['wall_seconds'],
+            '% time': f"{100 * s['wall_seconds'] / total:.0f}%",
+            'Prompt tok': s['prompt_tokens'],
+            'Completion tok': s['completion_tokens'],
+            'Tool calls': s['tool_calls'],
+            'Search (s)': s['search_seconds'],
+        }
+        for s in trace['stages']
+    ])
+    st.caption(f"{trace['wall_seconds']} s, {trace['total_tokens']} tokens, {trace['tool_calls']} tool calls ({trace['mode']})")
+    if trace.get('tokens_saved'):
+        st.caption(f"🗜️ Context compaction saved ~{trace['tokens_saved']} prompt tokens")
+
+def render_sections(sections, text, image_url):
+    """Article body from section offsets into `text` (image shows with first h1 section)"""
+    for idx, s in enumerate(sections):
+        if idx == 0 and image_url:
+            st.markdown(
+                f'<img src="{image_url}" '
+                'style="float:right;width:250px;margin:0 0 1rem 1rem;border:1px solid #3d4451;border-radius:5px;">',
+                unsafe_allow_html=True
+            )
+        if s['level'] == 'h1':
+            st.header(s['heading'], anchor=s['anchor'])
+        elif s['level'] == 'h2':
+            st.subheader(s['heading'], anchor=s['anchor'])
         else:
-            if current:
-                current['content'] += line + "\n"
-    if current:
-        sections.append(current)
-    return sections
+            st.markdown(f'<{s["level"]} id="{s["anchor"]}">{s["heading"]}</{s["level"]}>', unsafe_allow_html=True)
+        content = text[s['body']:s['end']].strip()
+        if content:
+            st.markdown(content)
+
+RENDER_INTERVAL = 0.25
+
+def generate_live(topic, parallel, status_box, article_box, toc_box, fresh=False):
+    """
+    Runs the crew in a worker thread and redraws the article and TOC from the
+    streamed text (at most every RENDER_INTERVAL seconds) while it is written.
+    Streamlit elements are only touched from this, the script thread.
+
+    The Wikipedia summary is fetched alongside: it seeds the Data Extractor
+    and provides the lead image without a serial request at the end.
+    """
+    events = queue.Queue()
+    outcome = {}
+    summary = fetch_summary_async(topic)
+
+    def work():
+        try:
+            from crew import run_crew  # heavy (crewai); only imported once generation starts
+            outcome['raw'] = run_crew(topic, parallel_sections=parallel, on_event=lambda kind, value: events.put((kind, value)), seed=summary, fresh=fresh)
+        finally:
+            events.put(('done', None))
+
+    threading.Thread(target=work, daemon=True).start()
+    index = SectionIndex()
+    drawn = 0.0
+    while True:
+        kind, value = events.get()
+        if kind == 'done':
+            break
+        if kind in ('setup', 'trace'):
+            outcome[kind] = value
+        elif kind == 'stage':
+            status_box.info(value)
+        elif kind == 'token':
+            index.feed(value)
+            if time.monotonic() - drawn >= RENDER_INTERVAL:
+                sections = index.sections()
+                with toc_box.container():
+                    render_toc([(s['level'], s['heading'], s['anchor']) for s in sections])
+                with article_box.container():
+                    st.markdown('---', unsafe_allow_html=True)
+                    ready = summary.done() and not summary.exception() and summary.result()
+                    render_sections(sections, index.text, ready and ready.get('image_url'))
+                drawn = time.monotonic()
+    status_box.empty()
+    article_box.empty()
+    try:
+        image_url = (summary.result(timeout=1) or {}).get('image_url')
+    except Exception:
+        image_url = None
+    return outcome.get('raw') or index.text, outcome.get('setup'), image_url, outcome.get('trace')
+
+@st.cache_resource(show_spinner=False)
+def warm_up():
+    """Once per process: imports the crew stack and builds one of each agent in the background"""
+    def build():
+        try:
+            from agents import agent_pool, create_data_extractor, create_summarizer, create_page_formatter
+            agent_pool.warm(create_data_extractor)
+            agent_pool.warm(create_summarizer)
+            agent_pool.warm(create_page_formatter, stream=True)
+            import crew  # pre-imported so the first article pays no import cost
+        except Exception as e:
+            print(f"[Warm-up Error] {e}")
+
+    thread = threading.Thread(target=build, daemon=True)
+    thread.start()
+    return thread
+
+warm_up()
 
 # Page header & form
 st.markdown(
@@ -70,58 +173,70 @@ st.markdown(
 )
 with st.form("wiki_form"):
     keyword = st.text_input("Enter a topic:", placeholder="e.g., Ancient Rome, Quantum Physics...")
+    parallel = st.checkbox("⚡ Write sections in parallel (outline first, then every section at once)")
+    regenerate = st.checkbox("🔄 Regenerate (ignore the cached article for this topic)")
     submitted = st.form_submit_button("🚀 Generate Wikipedia Article")
 
-# Article generation (with proper timing)
+# Sidebar TOC placeholder (filled live while generating, then from st.session_state.headings)
+with st.sidebar:
+    toc_box = st.empty()
+    trace_box = st.empty()
+    st.markdown('<div class="sidebar-footer">Built by Div &#10084;&#65039;</div>', unsafe_allow_html=True)
+
+# Article generation (served from the article cache when this topic was generated before)
 if submitted and keyword:
-    start_time = datetime.now()
-    with st.spinner("Generating article…"):
-        raw = run_crew(keyword.strip())
-        sections = parse_sections(raw)
+    cache = get_article_cache()
+    cached = cache.get(keyword) if cache and not regenerate else None
+    if cached:
+        st.session_state.result = cached['markdown']
+        sections = cached['sections']
+        if sections and 'body' not in sections[0]:
+            sections = index_sections(cached['markdown'])  # stored before sections were offset-based
+        st.session_state.sections = sections
+        st.session_state.headings = [(s['level'], s['heading'], s['anchor']) for s in sections]
+        st.session_state.image_url = cached['image_url']
+        st.session_state.topic = cached['topic']
+        st.session_state.generated_time = cached['metadata'].get('generated_time')
+        st.session_state.trace = cached['metadata'].get('trace')
+        st.session_state.cached_at = datetime.fromtimestamp(cached['created_at']).strftime('%Y-%m-%d %H:%M')
+        st.success(f"⚡ Loaded cached article from {st.session_state.cached_at}")
+    else:
+        start_time = datetime.now()
+        raw, setup_seconds, image_url, trace = generate_live(keyword.strip(), parallel, st.empty(), st.empty(), toc_box, fresh=regenerate)
+        sections = index_sections(raw)
         headings = [(s['level'], s['heading'], s['anchor']) for s in sections]
         st.session_state.result = raw
         st.session_state.sections = sections
         st.session_state.headings = headings
-        st.session_state.image_url = fetch_image(keyword)
+        st.session_state.image_url = image_url
         st.session_state.topic = keyword.strip()
-    end_time = datetime.now()
-    st.session_state.generated_time = round((end_time - start_time).total_seconds(), 2)
-    st.success(f"✅ Done in {st.session_state.generated_time} seconds")
+        st.session_state.cached_at = None
+        st.session_state.trace = trace
+        end_time = datetime.now()
+        st.session_state.generated_time = round((end_time - start_time).total_seconds(), 2)
+        if cache:
+            cache.put(keyword.strip(), raw, sections, st.session_state.image_url, {
+                'generated_time': st.session_state.generated_time,
+                'word_count': len(raw.split()),
+                'generated_at': start_time.isoformat(timespec='seconds'),
+                'mode': 'parallel' if parallel else 'sequential',
+                'setup_seconds': round(setup_seconds, 4) if setup_seconds is not None else None,
+                'trace': trace,
+            })
+        st.success(f"✅ Done in {st.session_state.generated_time} seconds")
 
-# Sidebar TOC (always built from st.session_state.headings)
-with st.sidebar:
-    st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
-    st.markdown('<div class="toc-heading">📋 Table of Contents</div>', unsafe_allow_html=True)
-    if st.session_state.headings:
-        for level, heading, anchor in st.session_state.headings:
-            indent = 'margin-left:1em;' if level == 'h3' else ''
-            st.markdown(
-                f'<div class="toc-item" style="{indent}"><a href="#{anchor}">🔗 {heading}</a></div>',
-                unsafe_allow_html=True
-            )
-    else:
-        st.markdown('<div class="toc-item"><em>Generate an article to see contents</em></div>', unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-    st.markdown('<div class="sidebar-footer">Built by Div &#10084;&#65039;</div>', unsafe_allow_html=True)
+with toc_box.container():
+    render_toc(st.session_state.headings)
+with trace_box.container():
+    render_trace(st.session_state.trace)
 
-# Article display (image shows with first h1 section)
+# Article display
 if st.session_state.sections:
     st.markdown('---', unsafe_allow_html=True)
-    for idx, s in enumerate(st.session_state.sections):
-        if idx == 0 and st.session_state.image_url:
-            st.markdown(
-                f'<img src="{st.session_state.image_url}" '
-                'style="float:right;width:250px;margin:0 0 1rem 1rem;border:1px solid #3d4451;border-radius:5px;">',
-                unsafe_allow_html=True
-            )
-        if s['level'] == 'h1':
-            st.header(s['heading'], anchor=s['anchor'])
-        elif s['level'] == 'h2':
-            st.subheader(s['heading'], anchor=s['anchor'])
-        elif s['level'] == 'h3':
-            st.markdown(f'<h3 id="{s["anchor"]}">{s["heading"]}</h3>', unsafe_allow_html=True)
-        if s['content'].strip():
-            st.markdown(s['content'].strip())
+    render_sections(st.session_state.sections, st.session_state.result, st.session_state.image_url)
     st.markdown('---', unsafe_allow_html=True)
-    st.info(f"📅 Generated in {st.session_state.generated_time} seconds")
+    if st.session_state.cached_at:
+        st.info(f"📅 Cached article from {st.session_state.cached_at} (originally generated in {st.session_state.generated_time} seconds) – tick Regenerate for a fresh one")
+    else:
+        st.info(f"📅 Generated in {st.session_state.generated_time} seconds")
     st.info("🔄 Enter a new topic above to generate another article")
@@ -0,0 +1,246 @@
+# retrieval.py - Persistent, deduplicated page index behind the Data Extractor's web search
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from html.parser import HTMLParser
+import numpy as np
+import requests
+from gateway import get_gateway
+from charsets import declared_encoding, sniff_encoding  # repository root, on sys.path via gateway
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.wiki_index.sqlite3')
+EMBED_MODEL = os.getenv('WIKI_EMBED_MODEL', 'text-embedding-3-small')
+EMBED_BATCH = 128
+CHUNK_CHARS = 1200
+PAGE_TTL = 7 * 24 * 3600
+MAX_PAGES = 2000
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+TOP_K = 5
+SEARCH_PAGES = 50
+EVICT_EVERY = 20
+USER_AGENT = 'Mozilla/5.0 (compatible; WikiBuilder/1.0)'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    embedding BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_chunks (
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (url, position)
+);
+CREATE INDEX IF NOT EXISTS page_chunks_hash ON page_chunks (hash);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+"""
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def chunk_key(text):
+    # The model is part of the key so switching models never mixes vector spaces
+    return text_hash(f"{EMBED_MODEL}\x00{text}")
+
+# HTML → readable text (scripts, styles and page chrome dropped)
+class TextExtractor(HTMLParser):
+    SKIP = {'script', 'style', 'noscript', 'svg', 'nav', 'footer', 'header', 'form'}
+    BLOCK = {'p', 'div', 'li', 'section', 'article', 'br', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skipping:
+            self.skipping -= 1
+        elif tag in self.BLOCK:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+def download(url, max_bytes=MAX_PAGE_BYTES, timeout=15):
+    """Streams at most max_bytes of `url` and decodes it with its declared (or <meta>) charset"""
+    with requests.get(url, timeout=timeout, headers={'User-Agent': USER_AGENT}, stream=True) as response:
+        response.raise_for_status()
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+        body = bytes(body[:max_bytes])
+        return body.decode(sniff_encoding(body[:4096], declared_encoding(response)), errors='replace')
+
+def html_to_text(html):
+    parser = TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = (' '.join(line.split()) for line in ''.join(parser.parts).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def chunk_text(text, size=CHUNK_CHARS):
+    """Packs whole paragraphs (or sentences of very long ones) into chunks of about `size` characters"""
+    chunks = []
+    current = ''
+    for paragraph in text.split('\n'):
+        pieces = re.split(r'(?<=[.!?])\s+', paragraph) if len(paragraph) > size else [paragraph]
+        for piece in pieces:
+            if current and len(current) + len(piece) + 1 > size:
+                chunks.append(current)
+                current = ''
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+class RetrievalIndex:
+    """
+    Local vector index of pages fetched for research.
+
+    Pages are re-fetched at most once per `page_ttl`. Chunks are keyed by
+    the SHA-256 of their text, so text shared between pages, topics or
+    re-fetches is embedded exactly once; new chunks are embedded in batches
+    of EMBED_BATCH per API call. At most `max_pages` pages are kept (least
+    recently searched dropped first) and chunks no page refers to any more
+    are deleted with them. Searches across the whole index only score the
+    chunks of the `search_pages` most recently used pages.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, page_ttl=PAGE_TTL, max_pages=MAX_PAGES, embed=None, search_pages=SEARCH_PAGES):
+        self.page_ttl = page_ttl
+        self.max_pages = max_pages
+        self.search_pages = search_pages
+        self.embed = embed or embed_texts
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        self.stats = {'pages_fetched': 0, 'pages_reused': 0, 'chunks_embedded': 0, 'chunks_reused': 0}
+
+    def _fresh(self, url):
+        with self.lock:
+            row = self.db.execute('SELECT fetched_at FROM pages WHERE url = ?', (url,)).fetchone()
+        return row is not None and row[0] > time.time() - self.page_ttl
+
+    def add_page(self, url):
+        """Fetches and indexes `url` unless a fresh copy is already indexed"""
+        if self._fresh(url):
+            self.stats['pages_reused'] += 1
+            return
+        self.add_text(url, html_to_text(download(url)))
+        self.stats['pages_fetched'] += 1
+
+    def add_text(self, url, text):
+        chunks = chunk_text(text)
+        hashes = [chunk_key(chunk) for chunk in chunks]
+        with self.lock:
+            known = {
+                row[0] for row in self.db.execute(
+                    f"SELECT hash FROM chunks WHERE hash IN ({','.join('?' * len(hashes))})", hashes
+                )
+            } if hashes else set()
+        missing = {}
+        for chunk, digest in zip(chunks, hashes):
+            if digest not in known:
+                missing.setdefault(digest, chunk)
+        self.stats['chunks_reused'] += len(hashes) - len(missing)
+        self.stats['chunks_embedded'] += len(missing)
+
+        # Embed only never-seen text, EMBED_BATCH chunks per request
+        new_rows = []
+        items = list(missing.items())
+        for start in range(0, len(items), EMBED_BATCH):
+            batch = items[start:start + EMBED_BATCH]
+            vectors = self.embed([chunk for _, chunk in batch])
+            new_rows += [(digest, chunk, normalize(vector).tobytes()) for (digest, chunk), vector in zip(batch, vectors)]
+
+        now = time.time()
+        with self.lock:
+            self.db.execute('BEGIN')
+            self.db.executemany('INSERT OR IGNORE INTO chunks VALUES (?, ?, ?)', new_rows)
+            self.db.execute('DELETE FROM page_chunks WHERE url = ?', (url,))
+            self.db.executemany('INSERT INTO page_chunks VALUES (?, ?, ?)', [(url, i, h) for i, h in enumerate(hashes)])
+            self.db.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                (url, text_hash('\n'.join(hashes)), now, now)
+            )
+            self.db.execute('COMMIT')
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        self.db.execute(
+            'DELETE FROM page_chunks WHERE url IN (SELECT url FROM pages ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_pages,)
+        )
+        self.db.execute('DELETE FROM pages WHERE url NOT IN (SELECT url FROM pages ORDER BY accessed_at DESC LIMIT ?)', (self.max_pages,))
+        self.db.execute('DELETE FROM chunks WHERE hash NOT IN (SELECT hash FROM page_chunks)')
+
+    def search(self, query, url=None, top_k=TOP_K):
+        """Best-matching chunks for `query`, within one page or across the recently used pages"""
+        with self.lock:
+            if url:
+                rows = self.db.execute(
+                    'SELECT DISTINCT c.text, c.embedding FROM chunks c JOIN page_chunks p ON p.hash = c.hash WHERE p.url = ?',
+                    (url,)
+                ).fetchall()
+                self.db.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            else:
+                rows = self.db.execute(
+                    'SELECT DISTINCT c.text, c.embedding FROM chunks c JOIN page_chunks p ON p.hash = c.hash '
+                    'WHERE p.url IN (SELECT url FROM pages ORDER BY accessed_at DESC LIMIT ?)',
+                    (self.search_pages,)
+                ).fetchall()
+        if not rows:
+            return []
+        matrix = np.frombuffer(b''.join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        scores = matrix @ normalize(self.embed([query])[0])
+        best = np.argsort(-scores)[:top_k]
+        return [(rows[i][0], float(scores[i])) for i in best]
+
+def normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def embed_texts(texts):
+    """Embeds a batch of texts with one request through the shared LLM gateway (pooled, rate-limited)"""
+    return get_gateway().embed(texts, EMBED_MODEL)
+
+# Shared index (configured via environment)
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RetrievalIndex(
+                path=os.getenv('WIKI_INDEX_PATH', DEFAULT_PATH),
+                page_ttl=float(os.getenv('WIKI_INDEX_TTL', PAGE_TTL)),
+                max_pages=int(os.getenv('WIKI_INDEX_MAX_PAGES', MAX_PAGES)),
+                search_pages=int(os.getenv('WIKI_INDEX_SEARCH_PAGES', SEARCH_PAGES))
+            )
+        return _index
@@ -0,0 +1,121 @@
+# sections.py - Incremental, offset-based markdown section indexer
+
+import re
+
+HEADING_RE = re.compile(r'(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+FENCES = ('```', '~~~')
+
+def slugify(heading):
+    return re.sub(r'[\s\W]+', '-', heading.lower()).strip('-') or 'section'
+
+class SectionIndex:
+    """
+    Indexes markdown headings as it is fed, chunk by chunk.
+
+    Each heading is stored as offsets into the source text ('start' of the
+    heading line, 'body' where its content starts, 'end' where the next
+    heading begins) rather than copied content, so feeding is linear in the
+    text length and a streamed article can be re-rendered after every chunk
+    without re-parsing what came before. Any heading depth (# to ######) is
+    recognised, '#' lines inside code fences are ignored, and anchors are
+    made unique by suffixing -2, -3, ...
+
+    Text before the first heading is not part of any section.
+    """
+
+    def __init__(self, text=''):
+        self.parts = []
+        self.length = 0
+        self.pending = ''
+        self.pending_start = 0
+        self.headings = []
+        self.anchors = {}
+        self.fence = None
+        self.closed = False
+        self._text = None
+        if text:
+            self.feed(text)
+
+    def feed(self, chunk):
+        if not chunk:
+            return self
+        self.parts.append(chunk)
+        self.length += len(chunk)
+        self._text = None
+
+        # Only the unfinished last line is carried over, never the whole text
+        buffer = self.pending + chunk
+        base = self.pending_start
+        pos = 0
+        newline = buffer.find('\n')
+        while newline >= 0:
+            self._line(buffer[pos:newline], base + pos, base + newline + 1)
+            pos = newline + 1
+            newline = buffer.find('\n', pos)
+        self.pending = buffer[pos:]
+        self.pending_start = base + pos
+        return self
+
+    def close(self):
+        """Indexes the final line if it has no trailing newline; call once the text is complete"""
+        if not self.closed and self.pending:
+            self._line(self.pending, self.pending_start, self.length)
+            self.pending = ''
+            self.pending_start = self.length
+        self.closed = True
+        return self
+
+    def _line(self, line, start, body):
+        if line[:1] not in ('#', '`', '~', ' '):
+            return
+        stripped = line.lstrip(' ')
+        if stripped[:3] in FENCES:
+            if self.fence is None:
+                self.fence = stripped[:3]
+            elif stripped.startswith(self.fence):
+                self.fence = None
+            return
+        if self.fence is not None or not line.startswith('#'):
+            return
+        match = HEADING_RE.match(line)
+        if not match:
+            return
+
+        heading = match.group(2).strip()
+        # anchors: every anchor handed out -> the last suffix tried on it
+        anchor = base = slugify(heading)
+        while anchor in self.anchors:
+            self.anchors[base] += 1
+            anchor = f"{base}-{self.anchors[base]}"
+        self.anchors[anchor] = 1
+
+        if self.headings:
+            self.headings[-1]['end'] = start
+        depth = len(match.group(1))
+        self.headings.append({
+            'level': f'h{depth}',
+            'depth': depth,
+            'heading': heading,
+            'anchor': anchor,
+            'start': start,
+            'body': body,
+            'end': None,
+        })
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = ''.join(self.parts)
+            self.parts = [self._text]
+        return self._text
+
+    def sections(self):
+        """Heading dicts with every 'end' filled in (the last section runs to the current end of text)"""
+        return [dict(h, end=self.length if h['end'] is None else h['end']) for h in self.headings]
+
+    def content(self, section):
+        return self.text[section['body']:section['end'] if section['end'] is not None else self.length]
+
+def index_sections(md):
+    """Sections of a complete markdown document (see SectionIndex)"""
+    return SectionIndex(md).close().sections()
@@ -0,0 +1,140 @@
+# tracing.py - Per-stage latency, token and tool-call tracing for crew runs
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from sections import slugify
+from gateway import usage_dict
+
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+
+_local = threading.local()
+
+def agent_usage(agent):
+    """Tokens an agent has used since it was checked out of the pool"""
+    process = getattr(agent, '_token_process', None)
+    return usage_dict(process.get_summary() if process is not None else None)
+
+class Trace:
+    """
+    Collects one article's timeline: a row per task (wall time, prompt and
+    completion tokens, tool calls and time spent in website search) plus,
+    in parallel mode, one row per section writer.
+
+    Tool calls are recorded by the tools themselves through record_tool()
+    and attributed to the next stage that finishes on the same trace.
+    """
+
+    def __init__(self, topic, mode):
+        self.topic = topic
+        self.mode = mode
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.mark = self.start
+        self.stages = []
+        self.sections = []
+        self.compaction = []
+        self.tool_calls = 0
+        self.search_seconds = 0.0
+        self.lock = threading.Lock()
+        self.result = None
+
+    def stage_done(self, name, agent, usage):
+        now = time.perf_counter()
+        with self.lock:
+            self.stages.append({
+                'stage': name,
+                'agent': agent,
+                'wall_seconds': round(now - self.mark, 3),
+                **usage,
+                'tool_calls': self.tool_calls,
+                'search_seconds': round(self.search_seconds, 3),
+            })
+            self.mark = now
+            self.tool_calls = 0
+            self.search_seconds = 0.0
+
+    def section_done(self, heading, seconds, usage):
+        with self.lock:
+            self.sections.append({'heading': heading, 'wall_seconds': round(seconds, 3), **usage})
+
+    def compacted(self, stage, stats):
+        """Records what context compaction saved on a stage's output (see compaction.py)"""
+        if stats:
+            with self.lock:
+                self.compaction.append({'stage': stage, **stats})
+
+    def record_tool(self, name, seconds):
+        with self.lock:
+            self.tool_calls += 1
+            if 'search' in name.lower():
+                self.search_seconds += seconds
+
+    @contextmanager
+    def active(self):
+        """Makes this the trace record_tool() reports to from the current thread"""
+        previous = getattr(_local, 'trace', None)
+        _local.trace = self
+        try:
+            yield self
+        finally:
+            _local.trace = previous
+
+    def finish(self, ok=True, error=None):
+        stages = list(self.stages)
+        if self.sections:
+            # Section writers run concurrently: the stage lasts as long as the slowest one
+            stages.append({
+                'stage': 'sections',
+                'agent': 'Page Formatter',
+                'wall_seconds': round(time.perf_counter() - self.mark, 3),
+                'prompt_tokens': sum(s['prompt_tokens'] for s in self.sections),
+                'completion_tokens': sum(s['completion_tokens'] for s in self.sections),
+                'total_tokens': sum(s['total_tokens'] for s in self.sections),
+                'tool_calls': 0,
+                'search_seconds': 0.0,
+            })
+        self.result = {
+            'topic': self.topic,
+            'mode': self.mode,
+            'started_at': self.started_at,
+            'ok': ok,
+            'error': error,
+            'wall_seconds': round(time.perf_counter() - self.start, 3),
+            'total_tokens': sum(s['total_tokens'] for s in stages),
+            'tool_calls': sum(s['tool_calls'] for s in stages),
+            'tokens_saved': sum(c['tokens_saved'] for c in self.compaction),
+            'stages': stages,
+            'compaction': self.compaction,
+            'sections': self.sections,
+        }
+        return self.result
+
+def record_tool(name, seconds):
+    """Called by tools after every run; a no-op outside a traced crew"""
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.record_tool(name, seconds)
+
+def publish(trace, on_event=None):
+    """Writes the finished trace as JSON (WIKI_TRACE=0 disables) and reports it as a 'trace' event"""
+    result = trace.result or trace.finish(ok=False, error="interrupted")
+    if os.getenv('WIKI_TRACE', '1') != '0':
+        try:
+            trace_dir = os.getenv('WIKI_TRACE_DIR', TRACE_DIR)
+            os.makedirs(trace_dir, exist_ok=True)
+            # The short uuid keeps same-second runs of one topic (easy with batch.py) from overwriting each other
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{slugify(trace.topic)[:60]}-{uuid.uuid4().hex[:8]}.json"
+            with open(os.path.join(trace_dir, name), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"[Trace Error] {e}")
+    print("⏱️ Trace: " + ', '.join(f"{s['stage']} {s['wall_seconds']}s/{s['total_tokens']} tok" for s in result['stages'])
+          + f" (compaction saved {result['tokens_saved']} tok)")
+    if on_event:
+        on_event('trace', result)
+    return result
@@ -0,0 +1,55 @@
+# wiki_summary.py - Wikipedia REST summary (extract + lead image), cached and fetched in the background
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+from article_cache import get_article_cache
+
+SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{}"
+TIMEOUT = 5
+USER_AGENT = 'WikiBuilder/1.0 (https://github.com/divcreates/Projects)'
+
+# One keep-alive session for every lookup (Wikipedia asks clients to send a descriptive User-Agent)
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+session.headers['User-Agent'] = USER_AGENT
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='wiki-summary')
+
+def fetch_summary(topic):
+    """
+    Returns {'title', 'extract', 'image_url', 'url'} for the topic's Wikipedia
+    page, or None if there is none. Both outcomes are cached, so a topic is
+    looked up at most once per cache period; network errors are not cached.
+    """
+    cache = get_article_cache()
+    cached = cache.get_summary(topic) if cache else None
+    if cached is not None:
+        return cached.get('summary')
+
+    try:
+        r = session.get(SUMMARY_URL.format(quote(topic.strip().replace(' ', '_'), safe='')), timeout=TIMEOUT)
+    except requests.RequestException as e:
+        print(f"[Summary Error] {e}")
+        return None
+
+    summary = None
+    if r.status_code == 200:
+        data = r.json()
+        if data.get('type') != 'disambiguation' and data.get('extract'):
+            summary = {
+                'title': data.get('title'),
+                'extract': data['extract'],
+                'image_url': data.get('thumbnail', {}).get('source'),
+                'url': data.get('content_urls', {}).get('desktop', {}).get('page'),
+            }
+    elif r.status_code != 404:
+        return None  # transient failure; try again next time
+    if cache:
+        cache.put_summary(topic, {'summary': summary})
+    return summary
+
+def fetch_summary_async(topic):
+    """Starts fetch_summary in the background; returns a Future"""
+    return _executor.submit(fetch_summary, topic)
@@ -0,0 +1,26 @@
+# charsets.py - Page charset detection shared by Website_Auditor's extractor and Wiki-Builder's search index
+
+import codecs
+import re
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+def declared_encoding(response):
+    # requests falls back to ISO-8859-1 for text/* without a charset; only trust explicit ones
+    content_type = response.headers.get('Content-Type', '')
+    return response.encoding if 'charset' in content_type.lower() else None
+
+def sniff_encoding(head, declared=None):
+    """
+    Codec for a page: the declared charset, else a <meta charset> in `head`,
+    else UTF-8. Names Python does not know are skipped, so a bogus charset
+    never fails the decode.
+    """
+    match = CHARSET_RE.search(head)
+    for name in (declared, match and match.group(1).decode('ascii')):
+        if name:
+            try:
+                return codecs.lookup(name).name
+            except LookupError:
+                pass
+    return 'utf-8'
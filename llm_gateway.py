@@ -0,0 +1,347 @@
+# llm_gateway.py - One pooled, rate-limited, memoizing OpenAI chat gateway shared by both apps
+#
+# Website_Auditor streams its GPT-4o reports through it and every Wiki-Builder
+# agent calls it via agents/llm.py. Within a process all callers share one
+# HTTP connection pool, one requests/tokens-per-minute budget, one set of
+# in-flight requests (identical prompts are sent once) and one response cache.
+
+import contextvars
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+MODEL = "gpt-4o"
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.llm_cache.sqlite3')
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_RPM = 500
+DEFAULT_TPM = 300000
+DEFAULT_POOL_SIZE = 20
+DEFAULT_RETRIES = 5
+EVICT_EVERY = 50
+WINDOW = 60.0
+MAX_BACKOFF = 60.0
+COMPLETION_ESTIMATE = 1000
+NO_USAGE = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+_read_cache = contextvars.ContextVar('llm_gateway_read_cache', default=True)
+
+@contextmanager
+def fresh_responses():
+    """
+    Inside this block (and in contexts copied from it, see contextvars.copy_context)
+    answers are never served from the response cache; new answers still refresh it.
+    """
+    token = _read_cache.set(False)
+    try:
+        yield
+    finally:
+        _read_cache.reset(token)
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+def request_key(model, messages, params):
+    """SHA-256 of everything that shapes the answer: model, messages and sampling parameters"""
+    payload = json.dumps({'model': model, 'messages': messages, 'params': params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def usage_dict(usage):
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        'total_tokens': getattr(usage, 'total_tokens', 0) or 0,
+    }
+
+# Rate Limiter (sliding one-minute window for requests and tokens)
+class RateLimiter:
+    """
+    Admits a request once both the requests and the tokens sent in the last
+    minute leave room for it; waiting callers back off with jitter so they
+    do not wake in lockstep. A token reservation is the prompt estimate plus
+    the expected completion, corrected to real usage afterwards. pause()
+    holds every caller back, e.g. for a 429's Retry-After.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_RPM, tokens_per_minute=DEFAULT_TPM):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.sent = deque()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens):
+        backoff = 0.25
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.sent and self.sent[0][0] <= now - WINDOW:
+                    self.sent.popleft()
+                used = sum(entry[1] for entry in self.sent)
+                if now >= self.paused_until and (
+                    (not self.requests_per_minute or len(self.sent) < self.requests_per_minute)
+                    # An empty window always admits one request, however large
+                    and (not self.tokens_per_minute or not self.sent or used + tokens <= self.tokens_per_minute)
+                ):
+                    entry = [now, tokens]
+                    self.sent.append(entry)
+                    return entry
+                wait = self.paused_until - now if now < self.paused_until else self.sent[0][0] + WINDOW - now
+            time.sleep(max(0.01, min(wait, backoff)) * random.uniform(0.8, 1.2))
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def settle(self, entry, tokens):
+        with self.lock:
+            entry[1] = tokens
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+# Response Cache (SQLite, keyed by request hash, TTL + LRU eviction)
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                'SELECT response FROM responses WHERE key = ? AND created_at > ?', (key, now - self.ttl)
+            ).fetchone()
+            if row:
+                self.db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, response):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        self.db.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,))
+        self.db.execute(
+            'DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)',
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM responses')
+
+class LLMGateway:
+    """
+    Chat completions through one shared client.
+
+    chat() returns {'content', 'finish_reason', 'usage', 'source'}; stream()
+    yields text deltas and returns the same dict when exhausted. `source` is
+    'api', 'cache' (answered from disk) or 'coalesced' (an identical request
+    was already in flight and its answer was shared); only 'api' responses
+    report token usage, since only they cost anything.
+    """
+
+    def __init__(self, limiter=None, cache=None, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_RETRIES):
+        self.limiter = limiter or RateLimiter()
+        self.cache = cache
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self._client = None
+        self.stats = {'requests': 0, 'tokens': 0, 'cache_hits': 0, 'coalesced': 0, 'retries': 0, 'rate_limited': 0}
+
+    @property
+    def client(self):
+        """OpenAI client over a pooled keep-alive HTTP client (SDK retries off; the gateway retries)"""
+        with self.lock:
+            if self._client is None:
+                import httpx
+                from openai import OpenAI  # deferred so apps that never call a model never import the SDK
+                self._client = OpenAI(
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                        timeout=httpx.Timeout(120.0, connect=10.0)
+                    )
+                )
+            return self._client
+
+    def chat(self, messages, model=MODEL, cache=True, **params):
+        completion = self._complete(messages, model, cache, params, stream=False)
+        while True:
+            try:
+                next(completion)
+            except StopIteration as done:
+                return done.value
+
+    def stream(self, messages, model=MODEL, cache=True, **params):
+        return self._complete(messages, model, cache, params, stream=True)
+
+    def embed(self, texts, model):
+        """Embeddings through the same pool and limiter (not cached: callers keep their own vectors)"""
+        entry = self.limiter.acquire(sum(estimate_tokens(text) for text in texts))
+        response = self._with_retries(lambda: self.client.embeddings.create(model=model, input=texts))
+        self.limiter.settle(entry, usage_dict(getattr(response, 'usage', None))['total_tokens'] or entry[1])
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _complete(self, messages, model, use_cache, params, stream):
+        key = request_key(model, messages, params)
+        cache = self.cache if use_cache else None
+        hit = cache.get(key) if cache and _read_cache.get() else None
+        if hit is not None:
+            self.stats['cache_hits'] += 1
+            if stream and hit['content']:
+                yield hit['content']
+            return {**hit, 'usage': NO_USAGE, 'source': 'cache'}
+
+        # Identical requests already in flight wait for that answer instead of paying for another
+        with self.lock:
+            leader = self.inflight.get(key)
+            if leader is None:
+                future = self.inflight[key] = Future()
+        if leader is not None:
+            self.stats['coalesced'] += 1
+            response = leader.result()
+            if stream and response['content']:
+                yield response['content']
+            return {**response, 'usage': NO_USAGE, 'source': 'coalesced'}
+
+        try:
+            response = yield from self._call(messages, model, params, stream)
+        except BaseException as e:
+            future.set_exception(RuntimeError("Shared request was abandoned") if isinstance(e, GeneratorExit) else e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+        future.set_result(response)
+        if cache and response['content'] and response['finish_reason'] in ('stop', None):
+            cache.put(key, {'content': response['content'], 'finish_reason': response['finish_reason']})
+        return response
+
+    def _call(self, messages, model, params, stream):
+        prompt_tokens = sum(estimate_tokens(str(m.get('content') or '')) for m in messages)
+        entry = None
+        for attempt in range(self.max_retries + 1):
+            entry = self.limiter.acquire(prompt_tokens + params.get('max_tokens', COMPLETION_ESTIMATE))
+            started = False
+            try:
+                if stream:
+                    parts, usage, finish = [], None, None
+                    chunks = self.client.chat.completions.create(
+                        model=model, messages=messages, stream=True, stream_options={'include_usage': True}, **params
+                    )
+                    for chunk in chunks:
+                        usage = getattr(chunk, 'usage', None) or usage
+                        if chunk.choices:
+                            finish = chunk.choices[0].finish_reason or finish
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                started = True
+                                parts.append(delta)
+                                yield delta
+                    content = ''.join(parts)
+                else:
+                    result = self.client.chat.completions.create(model=model, messages=messages, **params)
+                    content = result.choices[0].message.content or ''
+                    finish = result.choices[0].finish_reason
+                    usage = result.usage
+                break
+            except Exception as e:
+                # Once text has been streamed to the caller the request can no longer be replayed
+                if started or attempt == self.max_retries or not self._retry_after(e, attempt):
+                    self.limiter.settle(entry, 0)
+                    raise
+
+        usage = usage_dict(usage) if usage else {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': estimate_tokens(content),
+            'total_tokens': prompt_tokens + estimate_tokens(content),
+        }
+        self.limiter.settle(entry, usage['total_tokens'])
+        self.stats['requests'] += 1
+        self.stats['tokens'] += usage['total_tokens']
+        return {'content': content, 'finish_reason': finish, 'usage': usage, 'source': 'api'}
+
+    def _with_retries(self, request):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return request()
+            except Exception as e:
+                if attempt == self.max_retries or not self._retry_after(e, attempt):
+                    raise
+
+    def _retry_after(self, error, attempt):
+        """Sleeps before the next attempt if `error` is worth retrying; a 429 also pauses every other caller"""
+        import openai
+        if not isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)):
+            return False
+        response = getattr(error, 'response', None)
+        header = response.headers.get('retry-after') if response is not None else None
+        try:
+            delay = float(header)
+        except (TypeError, ValueError):
+            delay = min(MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.5)
+        if isinstance(error, openai.RateLimitError):
+            self.stats['rate_limited'] += 1
+            self.limiter.pause(delay)
+        self.stats['retries'] += 1
+        print(f"[LLM Gateway] {type(error).__name__}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+        return True
+
+# Shared gateway (configured via environment; LLM_CACHE=0 turns the response cache off)
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            cache = None
+            if os.getenv('LLM_CACHE', '1') != '0':
+                cache = ResponseCache(
+                    path=os.getenv('LLM_CACHE_PATH', DEFAULT_PATH),
+                    ttl=float(os.getenv('LLM_CACHE_TTL', DEFAULT_TTL)),
+                    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+                )
+            _gateway = LLMGateway(
+                limiter=RateLimiter(
+                    requests_per_minute=int(os.getenv('LLM_RPM', DEFAULT_RPM)),
+                    tokens_per_minute=int(os.getenv('LLM_TPM', DEFAULT_TPM))
+                ),
+                cache=cache,
+                pool_size=int(os.getenv('LLM_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', DEFAULT_RETRIES))
+            )
+        return _gateway